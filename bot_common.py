@@ -0,0 +1,1044 @@
+#
+# Copyright (c) 2024–2025, Daily
+#
+# SPDX-License-Identifier: BSD 2-Clause License
+#
+
+"""Session plumbing shared by bot.py and videobot.py.
+
+Both bots build the same speech pipeline and differ only in the HeyGen avatar
+stage, so the request config, the speech services and session runner, the
+process-wide HTTP pools and VAD model, the rolling LLM context, idle tracking
+and the transport event handlers (recording, kickoff, end-of-session webhook)
+live here. Module-level singletons are shared by every session in the process,
+whichever bot runs it.
+"""
+
+import asyncio
+import atexit
+import contextlib
+import copy
+import functools
+import math
+import os
+import sys
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime
+from types import SimpleNamespace
+from typing import Any, Awaitable, Callable, Dict, Final, List, Optional, Sequence, Tuple, cast
+
+import aiohttp
+import httpx
+import msgspec
+import orjson
+import psutil
+from dotenv import load_dotenv
+from loguru import logger
+from openai import AsyncOpenAI
+from openai.types.chat import ChatCompletionMessageParam
+from pipecat.audio.vad.silero import SileroVADAnalyzer
+from pipecat.frames.frames import (
+    LLMMessagesAppendFrame,
+    TTSAudioRawFrame,
+    TTSStartedFrame,
+    TTSStoppedFrame,
+    UserStartedSpeakingFrame,
+)
+from pipecat.pipeline.pipeline import Pipeline
+from pipecat.pipeline.runner import PipelineRunner
+from pipecat.pipeline.task import PipelineParams, PipelineTask
+from pipecat.processors.aggregators.openai_llm_context import OpenAILLMContext
+from pipecat.processors.frame_processor import FrameDirection, FrameProcessor
+from pipecat.processors.frameworks.rtvi import RTVIConfig, RTVIObserver, RTVIProcessor
+from pipecat.processors.user_idle_processor import UserIdleProcessor
+from pipecat.runner.types import RunnerArguments
+from pipecat.runner.utils import create_transport
+from pipecat.services.cartesia.tts import CartesiaTTSService
+from pipecat.services.deepgram.stt import DeepgramSTTService, LiveOptions
+from pipecat.services.openai.llm import OpenAILLMService
+from pipecat.transcriptions.language import Language
+from pipecat.transports.base_transport import BaseTransport, TransportParams
+from pipecat.transports.services.daily import DailyParams
+
+from greeting import render_greeting
+from semantic_cache import SemanticResponseCache
+from text_aggregator import ClauseTextAggregator
+
+# Google TTS import (available as alternative)
+# from pipecat.services.google.tts import GoogleHttpTTSService, Language
+
+# Mic audio rate shared by the transport and Deepgram so frames are never resampled
+AUDIO_IN_SAMPLE_RATE: Final[int] = 16000
+# Cartesia synthesizes raw PCM at exactly this rate, which the transport plays as-is
+AUDIO_OUT_SAMPLE_RATE: Final[int] = 24000
+
+# Rolling context window: messages kept verbatim before older ones are summarized.
+# Compaction waits until COMPACTION_BATCH messages have overflowed the window and
+# then folds them into the single running summary with one summarize call.
+MAX_RECENT_MESSAGES: Final[int] = 20
+COMPACTION_BATCH: Final[int] = 10
+COMPACTION_MODEL: Final[str] = "gpt-4o-mini"
+
+# The call is ended once the user has been silent for more than this in total
+MAX_IDLE_SECONDS: Final[float] = 200.0
+
+WEBHOOK_URL: Final[str] = "https://tryhumanlike.com/api/webhook/note"
+# Verbatim turns sent with the end-of-session webhook, after the system prompt and summary
+WEBHOOK_RECENT_MESSAGES: Final[int] = 40
+
+_ENV_LOADED = False
+
+
+def load_env():
+    """Load .env into os.environ once per process.
+
+    The runner and both bots call this at import; whichever runs first parses
+    the file and the others find it already applied.
+    """
+    global _ENV_LOADED
+    if not _ENV_LOADED:
+        load_dotenv(override=True)
+        _ENV_LOADED = True
+
+
+def _global_exception_handler(exc_type, exc_value, exc_traceback):
+    """Handle uncaught exceptions"""
+    # loguru formats the traceback on its (enqueued) sink, not on the failing thread
+    logger.opt(exception=(exc_type, exc_value, exc_traceback)).error(f"💥 UNCAUGHT EXCEPTION: {exc_type.__name__}")
+
+
+# Installed for whichever process imports the bots: the runner or a direct `python bot.py`
+sys.excepthook = _global_exception_handler
+
+
+def require_env(name: str, purpose: str = "") -> str:
+    """Read a required setting, failing loudly if it is missing."""
+    value = os.getenv(name)
+    if not value:
+        logger.error(f"❌ {name} not found!")
+        raise ValueError(f"{name} environment variable is required{purpose}")
+    return value
+
+
+@dataclass(frozen=True, slots=True)
+class ServiceKeys:
+    """API keys the speech pipeline needs, read once per process."""
+
+    deepgram: str
+    cartesia: str
+    openai: str
+    # Optional: recording is skipped without it
+    daily: Optional[str]
+
+
+@functools.cache
+def service_keys() -> ServiceKeys:
+    """Return the process-wide API keys.
+
+    The bots call this at import so a misconfigured process fails before taking
+    calls; a failed lookup is not cached, so a fixed environment is picked up.
+    """
+    load_env()
+    return ServiceKeys(
+        deepgram=require_env("DEEPGRAM_API_KEY"),
+        cartesia=require_env("CARTESIA_API_KEY"),
+        openai=require_env("OPENAI_API_KEY"),
+        daily=os.getenv("DAILY_API_KEY"),
+    )
+
+
+# UserIdleProcessor fires after this much silence (see MAX_IDLE_SECONDS)
+USER_IDLE_TIMEOUT: Final[float] = 15.0
+# Sink format for standalone runs (the dev runner installs its own sink)
+LOG_FORMAT: Final[str] = "{time:HH:mm:ss.SSS} {level} {message}"
+
+DEFAULT_BOT_NAME: Final[str] = "Nano Banana AI"
+DEFAULT_USER_NAME: Final[str] = "friend"
+SYSTEM_PROMPT_TEMPLATE: Final[str] = (
+    "You are {bot_name}, a fun and helpful AI assistant. Be creative, witty, and always ready to help {user_name}!"
+)
+FIRST_MESSAGE_TEMPLATE: Final[str] = (
+    "Say hi to {user_name}! I'm {bot_name}, your fun AI assistant ready to help with a smile!"
+)
+DEFAULT_MODEL: Final[str] = "gpt-4o-mini"
+DEFAULT_VOICE_ID: Final[str] = "71a7ad14-091c-4e8e-a314-022ece01c121"  # British Reading Lady
+
+# Answer near-duplicate user turns from the in-process semantic cache (see semantic_cache.py)
+SEMANTIC_CACHE_ENABLED: Final[bool] = os.getenv("ENABLE_SEMANTIC_CACHE", "0") == "1"
+
+
+@functools.lru_cache(maxsize=256)
+def default_system_prompt(bot_name: str, user_name: str) -> str:
+    """Interned system prompt, so sessions with the same names share one byte-identical string."""
+    return sys.intern(SYSTEM_PROMPT_TEMPLATE.format(bot_name=bot_name, user_name=user_name))
+
+
+@dataclass(frozen=True, slots=True)
+class BotConfig:
+    """Per-session settings resolved once from the runner request body."""
+
+    voice_id: str
+    model: str
+    bot_name: str
+    user_name: str
+    system_prompt: str
+    first_message: str
+    idle_timeout: float  # seconds; 0 disables idle nudges and the idle stage
+    templated: bool  # system prompt and first message both come from the templates
+    heygen_avatar_id: str = ""  # only read by videobot.py; empty means its default avatar
+
+
+def _parse_idle_timeout(value) -> float:
+    """Idle timeout from the request, falling back to the default on missing or bad input.
+
+    The config is parsed inside the bot task, after /start has already answered,
+    so a bad value must not raise here.
+    """
+    if value is None:
+        return USER_IDLE_TIMEOUT
+    try:
+        seconds = float(value)
+    except (TypeError, ValueError):
+        logger.warning(f"⚠️ Ignoring invalid idle_timeout {value!r}, using {USER_IDLE_TIMEOUT}s")
+        return USER_IDLE_TIMEOUT
+    if not math.isfinite(seconds) or seconds < 0:
+        logger.warning(f"⚠️ Ignoring out-of-range idle_timeout {value!r}, using {USER_IDLE_TIMEOUT}s")
+        return USER_IDLE_TIMEOUT
+    return seconds
+
+
+def parse_config(runner_args: RunnerArguments) -> BotConfig:
+    """Resolve the request body once; settings may sit at the top level or under ``body``."""
+    raw = getattr(runner_args, 'body', None) or {}
+    inner = raw.get('body') or raw
+    tts_config = raw.get('tts') or inner.get('tts') or {}
+    bot_name = inner.get('bot_name', DEFAULT_BOT_NAME)
+    user_name = inner.get('user_name', DEFAULT_USER_NAME)
+    return BotConfig(
+        voice_id=tts_config.get('voice_id', DEFAULT_VOICE_ID),
+        model=inner.get('model', DEFAULT_MODEL),
+        bot_name=bot_name,
+        user_name=user_name,
+        system_prompt=inner.get('system_prompt') or default_system_prompt(bot_name, user_name),
+        first_message=inner.get('first_message')
+            or FIRST_MESSAGE_TEMPLATE.format(bot_name=bot_name, user_name=user_name),
+        idle_timeout=_parse_idle_timeout(inner.get('idle_timeout')),
+        templated=not (inner.get('system_prompt') or inner.get('first_message')),
+        heygen_avatar_id=(raw.get('heygen_avatar_id') or inner.get('heygen_avatar_id') or '').strip(),
+    )
+
+
+# Loaded once per process, on first use; sessions get cheap copies via new_vad_analyzer()
+_VAD_ANALYZER: Optional[SileroVADAnalyzer] = None
+
+
+def load_vad_model() -> SileroVADAnalyzer:
+    """Load the Silero VAD model once per process; the bots call this at import."""
+    global _VAD_ANALYZER
+    if _VAD_ANALYZER is None:
+        logger.info("Loading Silero VAD model...")
+        _VAD_ANALYZER = SileroVADAnalyzer()
+        logger.info("✅ Silero VAD model loaded")
+    return _VAD_ANALYZER
+
+
+def new_vad_analyzer() -> SileroVADAnalyzer:
+    """Per-session VAD analyzer that reuses the process-wide Silero ONNX session.
+
+    The analyzer and its model wrapper carry per-stream state (buffers, LSTM
+    state), so each session gets shallow copies with fresh state while the
+    expensive, thread-safe InferenceSession is shared.
+    """
+    shared = load_vad_model()
+    vad = copy.copy(shared)
+    vad._model = copy.copy(shared._model)
+    vad._model.reset_states()
+    return vad
+
+
+def make_transport_params(**video: Any) -> Dict[str, Callable[[], TransportParams]]:
+    """Transport factories for create_transport; each call yields fresh params with a per-session VAD analyzer.
+
+    ``video`` overrides the video output settings (audio-only by default).
+    """
+    video = {"video_out_enabled": False, "video_out_is_live": False, **video}
+    audio = dict(
+        audio_in_enabled=True,
+        audio_in_sample_rate=AUDIO_IN_SAMPLE_RATE,
+        audio_out_enabled=True,
+        audio_out_sample_rate=AUDIO_OUT_SAMPLE_RATE,
+    )
+    return {
+        "daily": lambda: DailyParams(**audio, **video, vad_analyzer=new_vad_analyzer()),
+        "webrtc": lambda: TransportParams(**audio, **video, vad_analyzer=new_vad_analyzer()),
+    }
+
+
+# One Process handle for the lifetime of the bot; prime cpu_percent so later
+# non-blocking calls return the usage since the previous sample
+_PROC = psutil.Process()
+psutil.cpu_percent(interval=None)
+
+
+def log_memory_usage():
+    """Log current memory usage"""
+    try:
+        memory_info = _PROC.memory_info()
+        logger.debug("📊 Memory: {:.2f} MB, CPU: {:.1f}%",
+                     memory_info.rss / 1024 / 1024, psutil.cpu_percent(interval=None))
+    except Exception as e:
+        logger.warning(f"⚠️ Could not get memory stats: {e}")
+
+
+class OrjsonAsyncClient(httpx.AsyncClient):
+    """httpx client that encodes `json=` request bodies with orjson (straight to UTF-8 bytes)."""
+
+    def build_request(self, method, url, *, content=None, json=None, headers=None, **kwargs):
+        if json is not None and content is None:
+            try:
+                content = orjson.dumps(json)
+            except TypeError:
+                pass  # Not plain JSON types - let httpx encode it
+            else:
+                json = None
+                headers = httpx.Headers(headers)
+                headers.setdefault("Content-Type", "application/json")
+        return super().build_request(method, url, content=content, json=json, headers=headers, **kwargs)
+
+
+# One pooled (HTTP/2 when `h2` is installed) client for every OpenAI call in the process
+_HTTPX: OrjsonAsyncClient | None = None
+
+
+def get_httpx() -> OrjsonAsyncClient:
+    """Return the shared httpx client, creating it on first use."""
+    global _HTTPX
+    if _HTTPX is None or _HTTPX.is_closed:
+        kwargs = dict(
+            timeout=httpx.Timeout(30, connect=5),
+            limits=httpx.Limits(max_keepalive_connections=32, max_connections=64),
+        )
+        try:
+            _HTTPX = OrjsonAsyncClient(http2=True, **kwargs)
+        except ImportError:
+            logger.warning("⚠️ h2 not installed - OpenAI requests fall back to HTTP/1.1")
+            _HTTPX = OrjsonAsyncClient(**kwargs)
+    return _HTTPX
+
+
+class PooledOpenAILLMService(OpenAILLMService):
+    """OpenAILLMService whose SDK client rides on the shared httpx pool."""
+
+    def create_client(self, api_key=None, base_url=None, organization=None, project=None, default_headers=None, **kwargs):
+        return AsyncOpenAI(
+            api_key=api_key,
+            base_url=base_url,
+            organization=organization,
+            project=project,
+            default_headers=default_headers,
+            http_client=get_httpx(),
+        )
+
+
+class PromptBuffer:
+    """Conversation messages with a byte-stable system prompt at the head.
+
+    OpenAI's automatic prompt cache only hits when the request prefix is identical
+    across calls, so the system prompt is never rewritten and one-off instructions
+    (the kickoff, idle nudges) are sent at the tail of the request instead.
+
+    Layout is ``static_prefix + [summary] + recent``. Once ``recent`` holds
+    ``compaction_batch`` messages more than ``max_recent``, the overflow is
+    evicted in one go and folded, together with the previous summary, into a
+    single summary message. The context therefore never exceeds
+    ``max_recent + compaction_batch`` turns plus two system messages, and a
+    session makes one summarize call per ``compaction_batch`` messages.
+    """
+
+    def __init__(
+        self,
+        system_prompt: str,
+        max_recent: int = MAX_RECENT_MESSAGES,
+        compaction_batch: int = COMPACTION_BATCH,
+        summarize: Optional[Callable[[list, str], Awaitable[str]]] = None,
+    ):
+        self.static_prefix: Final[tuple] = ({"role": "system", "content": system_prompt},)
+        self.summary: Optional[ChatCompletionMessageParam] = None
+        self.max_recent = max_recent
+        self.compaction_batch = compaction_batch
+        self._summarize = summarize
+        self._summary_text = ""
+        self._evicted_count = 0
+        self._compaction_lock = asyncio.Lock()
+        # Shared with OpenAILLMContext, which commits user/assistant turns here
+        self.messages: List[ChatCompletionMessageParam] = list(self.static_prefix)
+
+    def trim(self) -> List[ChatCompletionMessageParam]:
+        """Drop the oldest turns (in place) once a full batch has overflowed and return them."""
+        head = self.head
+        overflow = len(self.messages) - head - self.max_recent
+        if overflow < self.compaction_batch:
+            return []
+        evicted = self.messages[head:head + overflow]
+        del self.messages[head:head + overflow]
+        self._evicted_count += overflow
+        return evicted
+
+    @property
+    def head(self) -> int:
+        """Number of leading system messages (the static prefix and the summary, if any)."""
+        return len(self.static_prefix) + (self.summary is not None)
+
+    @property
+    def turn_count(self) -> int:
+        """Conversation messages committed this session, including ones already summarized."""
+        return self._evicted_count + len(self.messages) - self.head
+
+    async def compact(self, evicted: List[ChatCompletionMessageParam]):
+        """Fold evicted turns into the running summary, replacing the previous one."""
+        if not evicted or self._summarize is None:
+            return
+        async with self._compaction_lock:
+            try:
+                self._summary_text = await self._summarize(evicted, self._summary_text)
+            except Exception as e:
+                logger.warning(f"Context compaction failed, dropping {len(evicted)} old messages: {e}")
+                return
+            message = cast(ChatCompletionMessageParam, {
+                "role": "system",
+                "content": f"Summary of the earlier conversation: {self._summary_text}",
+            })
+            index = len(self.static_prefix)
+            if self.summary is None:
+                self.messages.insert(index, message)
+            else:
+                self.messages[index] = message
+            self.summary = message
+
+
+class RollingLLMContext(OpenAILLMContext):
+    """OpenAILLMContext that keeps its history inside a PromptBuffer window."""
+
+    def __init__(self, prompt: PromptBuffer):
+        super().__init__(prompt.messages)
+        self._prompt = prompt
+        self._compaction_tasks: set = set()
+
+    def _enforce_window(self):
+        evicted = self._prompt.trim()
+        if evicted:
+            # Summarize in the background; the LLM call never waits on compaction
+            task = asyncio.get_running_loop().create_task(self._prompt.compact(evicted))
+            self._compaction_tasks.add(task)
+            task.add_done_callback(self._compaction_tasks.discard)
+
+    def add_message(self, message):
+        super().add_message(message)
+        self._enforce_window()
+
+    def add_messages(self, messages):
+        # LLMMessagesAppendFrame (idle nudges, kickoff) lands here, not in add_message
+        super().add_messages(messages)
+        self._enforce_window()
+
+    def set_messages(self, messages):
+        super().set_messages(messages)
+        self._enforce_window()
+
+
+async def summarize_messages(
+    client: AsyncOpenAI, messages: List[ChatCompletionMessageParam], previous_summary: str = ""
+) -> str:
+    """Condense old conversation turns, and the summary so far, into one short summary with a cheap model."""
+    transcript = "\n".join(f"{m['role']}: {m.get('content', '')}" for m in messages)
+    if previous_summary:
+        transcript = f"Summary so far: {previous_summary}\n\n{transcript}"
+    response = await client.chat.completions.create(
+        model=COMPACTION_MODEL,
+        messages=[
+            {"role": "system", "content": "Summarize this conversation excerpt in 2-4 sentences, merging in the summary so far. Keep names, facts and open questions."},
+            {"role": "user", "content": transcript},
+        ],
+        max_tokens=200,
+    )
+    return response.choices[0].message.content or ""
+
+
+class ActivityAwareIdleProcessor(UserIdleProcessor):
+    """UserIdleProcessor that also reports user speech, so no extra stage is needed to see it."""
+
+    def __init__(self, *, on_user_activity: Callable[[], None], **kwargs):
+        super().__init__(**kwargs)
+        self._on_user_activity = on_user_activity
+
+    async def process_frame(self, frame, direction: FrameDirection):
+        if isinstance(frame, UserStartedSpeakingFrame):
+            self._on_user_activity()
+        await super().process_frame(frame, direction)
+
+
+class IdleTracker:
+    """Tracks consecutive idle events for one session and nudges or ends the call.
+
+    ``task`` is assigned once the session's PipelineTask exists; the idle
+    processor that calls ``handle_idle`` sits inside that task's pipeline.
+    """
+
+    def __init__(self, idle_timeout: float):
+        self.idle_timeout = idle_timeout
+        self.task: Optional[PipelineTask] = None
+        self.consecutive_idle_count = 0
+        self.conversation_ended = False
+        self._idle_started_at: Optional[float] = None  # monotonic time the user went quiet
+
+    @property
+    def continuous_idle_time_seconds(self) -> float:
+        if self._idle_started_at is None:
+            return 0.0
+        return time.monotonic() - self._idle_started_at
+
+    def reset_idle_timer(self):
+        """Reset the continuous idle timer when user speaks"""
+        if self._idle_started_at is not None:
+            logger.debug("🎤 User spoke - resetting continuous idle timer (was {:.0f}s)", self.continuous_idle_time_seconds)
+        self._idle_started_at = None
+
+    async def handle_idle(self, processor):
+        if self._idle_started_at is None:
+            # First idle event arrives idle_timeout seconds into the silence
+            self._idle_started_at = time.monotonic() - self.idle_timeout
+        idle_seconds = self.continuous_idle_time_seconds
+        logger.debug("⏱️ Continuous idle time: {:.0f}s", idle_seconds)
+
+        if idle_seconds > MAX_IDLE_SECONDS:
+            logger.debug("⏰ Continuous idle time exceeded {:.0f} seconds - cancelling task", MAX_IDLE_SECONDS)
+            try:
+                await self.task.cancel()
+                logger.debug("✅ Task cancellation requested")
+                return
+            except Exception as e:
+                logger.warning(f"⚠️ Error cancelling task: {e}")
+
+        # If conversation has ended, don't do normal idle processing
+        if self.conversation_ended:
+            logger.debug("🚫 Conversation ended - skipping normal idle processing")
+            return
+
+        self.consecutive_idle_count += 1
+        logger.debug("🕐 Idle event #{} detected (continuous idle: {:.0f}s)", self.consecutive_idle_count, self.continuous_idle_time_seconds)
+
+        if self.consecutive_idle_count <= 2:
+            # First and second idle: ask if still there
+            tone_variations = [
+                "with a friendly, concerned tone",
+                "with a casual, checking-in tone"
+            ]
+            tone = tone_variations[self.consecutive_idle_count - 1]
+            nudge = f"Follow up on user, make the convrsation continue with ading a phrase or ask the user directly: Are you still there? Use {tone}. Keep it short and natural."
+            await self.task.queue_frames([LLMMessagesAppendFrame(messages=[{"role": "system", "content": nudge}], run_llm=True)])
+        else:
+            # Third idle: say goodbye and end conversation
+            logger.debug("👋 Third consecutive idle - ending conversation permanently")
+            goodbye = "Say a friendly goodbye to the user. Something like 'Ok, I think you might have stepped away. Talk to you later!' Keep it warm and natural."
+            await self.task.queue_frames([LLMMessagesAppendFrame(messages=[{"role": "system", "content": goodbye}], run_llm=True)])
+
+            # Mark conversation as ended - no more idle checking
+            self.conversation_ended = True
+
+
+# One HTTP session per process so HeyGen, Daily and webhook calls reuse pooled keep-alive TCP/TLS connections
+_HTTP_SESSION: aiohttp.ClientSession | None = None
+
+
+async def get_http_session() -> aiohttp.ClientSession:
+    """Return the shared aiohttp session, creating it on first use."""
+    global _HTTP_SESSION
+    if _HTTP_SESSION is None or _HTTP_SESSION.closed:
+        _HTTP_SESSION = aiohttp.ClientSession(
+            timeout=aiohttp.ClientTimeout(total=30, connect=10),
+            connector=aiohttp.TCPConnector(
+                limit=100, limit_per_host=20, ttl_dns_cache=300, keepalive_timeout=75
+            ),
+        )
+    return _HTTP_SESSION
+
+
+async def close_http_session():
+    """Close the shared aiohttp session. Call once when the process shuts down."""
+    global _HTTP_SESSION
+    if _HTTP_SESSION is not None and not _HTTP_SESSION.closed:
+        await _HTTP_SESSION.close()
+    _HTTP_SESSION = None
+
+
+@atexit.register
+def _close_http_session_at_exit():
+    # Fallback for runs that never call close_http_session() (e.g. direct `python bot.py`)
+    if _HTTP_SESSION is not None and not _HTTP_SESSION.closed:
+        with contextlib.suppress(Exception):
+            asyncio.run(close_http_session())
+
+
+async def start_daily_recording(room_url: str, api_key: Optional[str]) -> bool:
+    """Start recording via Daily REST API when first participant joins."""
+    try:
+        if not api_key:
+            logger.warning("⚠️ DAILY_API_KEY not found - skipping recording")
+            return False
+
+        # Extract room name from URL
+        room_name = room_url.split("/")[-1].split("?")[0]
+        logger.debug("🎥 Starting recording for room: {}", room_name)
+
+        # Start recording via Daily REST API
+        session = await get_http_session()
+        async with session.post(
+            f"https://api.daily.co/v1/rooms/{room_name}/recordings/start",
+            headers={
+                "Authorization": f"Bearer {api_key}",
+                "Content-Type": "application/json"
+            },
+            json={
+                "type": "cloud",  # Use cloud recording
+                # "layout": {
+                #         "preset": "portrait",
+                #         "variant": "vertical"
+                #     },
+                # "width": 1080,
+                # "height": 1920,
+                # "backgroundColor": "#000000"
+
+            }
+        ) as response:
+            if response.status == 200:
+                recording_data = await response.json()
+                logger.debug("✅ Recording started successfully: {}", recording_data.get('id', 'unknown'))
+                return True
+            else:
+                logger.error(f"❌ Failed to start recording: {response.status} - {await response.text()}")
+                return False
+
+    except Exception as e:
+        logger.error(f"❌ Error starting recording: {e}")
+        return False
+
+
+@dataclass
+class SessionContext:
+    """Per-session state the module-level transport event handlers act on."""
+
+    runner_args: RunnerArguments
+    task: PipelineTask
+    prompt: PromptBuffer
+    context: OpenAILLMContext
+    cfg: BotConfig
+    greeting_task: "asyncio.Task[Optional[Tuple[str, bytes]]]"
+    # Stage the pre-rendered greeting is queued at: below STT so the bot never
+    # transcribes its own voice, above the avatar so HeyGen still lip-syncs it
+    greeting_stage: FrameProcessor
+    idle_tracker: IdleTracker
+    # Optional: recording is skipped without it
+    daily_api_key: Optional[str] = None
+    # Set by the first disconnect-type event so the webhook/cancel run once
+    shutdown_sent: bool = False
+    # Sent with the webhook so the receiver can dedupe retries of the same session
+    session_id: str = field(default_factory=lambda: uuid.uuid4().hex)
+
+    @property
+    def messages(self) -> List[ChatCompletionMessageParam]:
+        return self.prompt.messages
+
+
+async def _on_client_connected(transport, client, ctx: SessionContext):
+    logger.info("👋 Client connected: {}", client)
+    try:
+        greeting = ctx.greeting_task.result() if ctx.greeting_task.done() else None
+        if greeting:
+            # Play the pre-rendered greeting straight away and record the turn it stands for
+            greeting_text, greeting_audio = greeting
+            ctx.context.add_message({"role": "user", "content": ctx.cfg.first_message})
+            ctx.context.add_message({"role": "assistant", "content": greeting_text})
+            for frame in (
+                TTSStartedFrame(),
+                TTSAudioRawFrame(audio=greeting_audio, sample_rate=AUDIO_OUT_SAMPLE_RATE, num_channels=1),
+                TTSStoppedFrame(),
+            ):
+                await ctx.greeting_stage.queue_frame(frame)
+            logger.debug("✅ Pre-rendered greeting queued: {:.50}...", greeting_text)
+            return
+
+        # Not rendered in time (or failed): let the LLM say it instead, and stop
+        # the render so it doesn't keep an OpenAI/Cartesia request open
+        ctx.greeting_task.cancel()
+        # Kick off the conversation.
+        # Kickoff is appended as a user turn so the cached system prefix stays intact
+        await ctx.task.queue_frames([
+            LLMMessagesAppendFrame(messages=[{"role": "user", "content": ctx.cfg.first_message}], run_llm=True)
+        ])
+        logger.debug("✅ Initial message queued: {:.50}...", ctx.cfg.first_message)
+    except Exception as e:
+        logger.exception(f"❌ Error in client connected handler: {e}")
+        raise
+
+
+# Strong refs for fire-and-forget webhook posts until they finish
+_WEBHOOK_TASKS: set = set()
+
+
+class WebhookPayload(msgspec.Struct):
+    """End-of-session webhook body; field order is the JSON key order."""
+
+    session_id: str
+    client_id: str
+    disconnect_time: str
+    conversation_context: list  # System prompt, summary and the last WEBHOOK_RECENT_MESSAGES turns
+    bot_name: str
+    user_name: str
+    total_messages: int  # Messages in conversation_context
+    turn_count: int  # Conversation messages over the whole session, summarized ones included
+    idle_tracker: dict
+
+
+# Schema-aware C encoder, reused for every webhook; unknown values fall back to str()
+_WEBHOOK_ENCODER = msgspec.json.Encoder(enc_hook=str)
+
+
+def _build_webhook_payload(client_id: str, disconnect_time: str, ctx: SessionContext) -> WebhookPayload:
+    """Snapshot of the conversation for the end-of-session webhook.
+
+    Only a shallow copy of the capped message list is taken here; encoding
+    happens in the background webhook task.
+    """
+    head = ctx.prompt.head
+    context = ctx.messages[:head] + ctx.messages[head:][-WEBHOOK_RECENT_MESSAGES:]
+    return WebhookPayload(
+        session_id=ctx.session_id,
+        client_id=client_id,
+        disconnect_time=disconnect_time,
+        conversation_context=context,
+        bot_name=ctx.cfg.bot_name,
+        user_name=ctx.cfg.user_name,
+        total_messages=len(context),
+        turn_count=ctx.prompt.turn_count,
+        idle_tracker={
+            "consecutive_idle_count": ctx.idle_tracker.consecutive_idle_count,
+            "conversation_ended": ctx.idle_tracker.conversation_ended,
+            "continuous_idle_time_seconds": ctx.idle_tracker.continuous_idle_time_seconds
+        },
+    )
+
+
+async def _post_webhook(payload: WebhookPayload):
+    """POST the session_end payload once; the receiver dedupes on session_id."""
+    try:
+        body = _WEBHOOK_ENCODER.encode(payload)
+        session = await get_http_session()
+        async with session.post(
+            WEBHOOK_URL,
+            data=body,
+            headers={"Content-Type": "application/json", "Idempotency-Key": payload.session_id},
+            timeout=aiohttp.ClientTimeout(total=5),  # 5 second timeout
+        ) as response:
+            if response.status == 200:
+                logger.debug("✅ Webhook sent successfully to {}", WEBHOOK_URL)
+            else:
+                logger.warning(f"⚠️ Webhook failed with status {response.status}: {await response.text()}")
+    except Exception as webhook_error:
+        logger.warning(f"⚠️ Webhook request failed: {webhook_error}")
+
+
+async def _on_client_disconnected(transport, client, *_, ctx: SessionContext):
+    client_id = str(client)
+    logger.info("👋 Client disconnected: {}", client_id)
+    if ctx.shutdown_sent:
+        return
+    ctx.shutdown_sent = True
+    ctx.greeting_task.cancel()
+    try:
+        # Send the (windowed) conversation context to the webhook without holding up teardown
+        payload = _build_webhook_payload(client_id, str(datetime.now()), ctx)
+        webhook = asyncio.create_task(_post_webhook(payload))
+        _WEBHOOK_TASKS.add(webhook)
+        webhook.add_done_callback(_WEBHOOK_TASKS.discard)
+
+        await ctx.task.cancel()
+        logger.debug("✅ Task cancellation requested")
+    except Exception as e:
+        logger.exception(f"❌ Error in client disconnected handler: {e}")
+        raise
+
+
+async def _on_first_participant_joined(transport, participant, ctx: SessionContext):
+    logger.debug("🎉 First participant joined: {}", participant)
+    logger.debug("🎯 Bot should start responding now")
+    log_memory_usage()
+
+    # Auto-start recording when first participant joins
+    room_url = getattr(ctx.runner_args, 'room_url', None)
+    if room_url:
+        logger.debug("🎥 Auto-starting recording for first participant...")
+        await start_daily_recording(room_url, ctx.daily_api_key)
+    else:
+        logger.warning("⚠️ No room URL available for recording")
+
+
+async def _on_call_state_updated(transport, state, ctx: SessionContext):
+    logger.debug("📞 Call state updated: {}", state)
+
+
+# Registered on each session's transport, bound to that session's SessionContext
+EVENT_HANDLERS: Final[dict] = {
+    "on_client_connected": _on_client_connected,
+    "on_client_disconnected": _on_client_disconnected,
+    "on_first_participant_joined": _on_first_participant_joined,
+    # Daily reports the same hang-up as both events; the handler runs once per session
+    "on_participant_left": _on_client_disconnected,
+    "on_call_state_updated": _on_call_state_updated,
+}
+
+
+async def run_session(
+    transport: BaseTransport,
+    runner_args: RunnerArguments,
+    cfg: BotConfig,
+    avatar_stages: Sequence[FrameProcessor] = (),
+):
+    """Build the speech pipeline for one session and run it until the call ends.
+
+    ``avatar_stages`` sit between TTS and the transport output; videobot.py
+    puts its HeyGen stage there and bot.py leaves it empty.
+    """
+    logger.info("🤖 Starting bot")
+    logger.debug("🔍 Runner args: {}", runner_args)
+    logger.debug("🔍 Transport type: {}", type(transport))
+    log_memory_usage()
+    keys = service_keys()
+
+    logger.debug("🎙️ Initializing speech services...")
+    try:
+        # Explicit raw-PCM hints so Deepgram never has to sniff container/sample rate;
+        # sample_rate matches the transport's audio_in_sample_rate (no resampling)
+        stt = DeepgramSTTService(api_key=keys.deepgram, live_options=LiveOptions(
+            model="nova-3-general",
+            encoding="linear16",
+            sample_rate=AUDIO_IN_SAMPLE_RATE,
+            channels=1,
+            language=Language.EN,
+            punctuate=True,
+            smart_format=True,
+            interim_results=True,
+            endpointing=200,
+        ))
+        logger.debug("✅ Deepgram STT service created")
+    except Exception as e:
+        logger.error(f"❌ Failed to create Deepgram STT: {e}")
+        raise
+
+    # Use Cartesia TTS as default for lower latency
+    try:
+        tts = CartesiaTTSService(
+            api_key=keys.cartesia,
+            voice_id=cfg.voice_id,  # Configurable voice ID (default: British Reading Lady)
+            sample_rate=AUDIO_OUT_SAMPLE_RATE,
+            encoding="pcm_s16le",
+            # Release text per clause so synthesis overlaps with LLM generation
+            text_aggregator=ClauseTextAggregator(),
+        )
+        logger.debug("✅ Cartesia TTS service created")
+    except Exception as e:
+        logger.error(f"❌ Failed to create Cartesia TTS: {e}")
+        raise
+
+    # Google TTS alternative (higher quality but more latency):
+    # # Check for Google credentials file
+    # credentials_file = os.path.join(os.path.dirname(__file__), "GOOGLE_TEST_CREDENTIALS.json")
+    # if os.path.exists(credentials_file):
+    #     try:
+    #         with open(credentials_file, 'r') as f:
+    #             google_credentials = f.read()
+    #         tts = GoogleHttpTTSService(
+    #             credentials=google_credentials,
+    #             voice_id="en-US-Chirp3-HD-Charon",
+    #             params=GoogleHttpTTSService.InputParams(
+    #                 language=Language.EN_US
+    #             )
+    #         )
+    #         print("✅ Google TTS service created")
+    #     except Exception as e:
+    #         print(f"⚠️ Google TTS failed, falling back to Cartesia: {e}")
+    #         tts = CartesiaTTSService(
+    #             api_key=keys.cartesia,
+    #             voice_id="71a7ad14-091c-4e8e-a314-022ece01c121",
+    #         )
+
+    logger.debug("🧠 Initializing LLM service...")
+    try:
+        # Customizable model from runner args (default to gpt-4o-mini)
+        llm = PooledOpenAILLMService(api_key=keys.openai, model=cfg.model)
+        logger.debug("✅ OpenAI LLM service created ({})", cfg.model)
+    except Exception as e:
+        logger.error(f"❌ Failed to create OpenAI LLM: {e}")
+        raise
+
+    logger.debug("🗨️ Setting up conversation context...")
+
+    openai_client = AsyncOpenAI(api_key=keys.openai, http_client=get_httpx())
+    prompt = PromptBuffer(cfg.system_prompt, summarize=functools.partial(summarize_messages, openai_client))
+
+    semantic_cache = SemanticResponseCache(openai_client, cfg.system_prompt) if SEMANTIC_CACHE_ENABLED else None
+
+    # Render the kickoff turn while the transport connects; templated greetings are
+    # shared by later sessions with the same names and voice
+    greeting_task = asyncio.create_task(render_greeting(
+        openai_client,
+        get_httpx(),
+        model=cfg.model,
+        system_prompt=cfg.system_prompt,
+        first_message=cfg.first_message,
+        cartesia_key=keys.cartesia,
+        voice_id=cfg.voice_id,
+        tts_model=tts.model_name,
+        sample_rate=AUDIO_OUT_SAMPLE_RATE,
+        shared=cfg.templated,
+    ))
+    llm_stages = [semantic_cache.lookup, llm, semantic_cache.recorder] if semantic_cache else [llm]
+
+    logger.debug("📝 Using system prompt: {:.50}...", cfg.system_prompt)
+
+    try:
+        context = RollingLLMContext(prompt)
+        context_aggregator = llm.create_context_aggregator(context)
+        logger.debug("✅ Context aggregator created")
+    except Exception as e:
+        logger.error(f"❌ Failed to create context aggregator: {e}")
+        raise
+
+    try:
+        rtvi = RTVIProcessor(config=RTVIConfig(config=[]))
+        logger.debug("✅ RTVI processor created")
+    except Exception as e:
+        logger.error(f"❌ Failed to create RTVI processor: {e}")
+        raise
+
+    logger.debug("🔧 Building pipelines...")
+
+    idle_tracker = IdleTracker(cfg.idle_timeout)
+
+    # Calls idle_tracker.handle_idle after idle_timeout seconds of silence and
+    # resets the continuous idle timer whenever the user starts speaking. With
+    # idle_timeout=0 the stage is left out so frames skip that hop entirely.
+    idle_stages = [ActivityAwareIdleProcessor(
+        callback=idle_tracker.handle_idle,
+        on_user_activity=idle_tracker.reset_idle_timer,
+        timeout=cfg.idle_timeout,
+    )] if cfg.idle_timeout > 0 else []
+    main_pipeline = Pipeline([
+        transport.input(),  # Transport user input
+        rtvi,  # RTVI processor
+        stt,  # Speech-to-Text
+        *idle_stages,  # Idle detection (none when idle_timeout is 0)
+        context_aggregator.user(),  # User responses
+        *llm_stages,  # Language Model (behind the semantic cache when enabled)
+        tts,  # Text-to-Speech
+        *avatar_stages,  # HeyGen avatar (videobot.py only)
+        transport.output(),  # Transport bot output
+        context_aggregator.assistant(),  # Assistant responses
+    ])
+    logger.debug("✅ Pipeline created ({} avatar stage(s))", len(avatar_stages))
+
+    logger.debug("📋 Creating pipeline task...")
+    try:
+        task = PipelineTask(
+            main_pipeline,
+            params=PipelineParams(
+                enable_metrics=True,
+                enable_usage_metrics=True,
+            ),
+            observers=[RTVIObserver(rtvi)],
+        )
+        logger.debug("✅ Pipeline task created")
+        idle_tracker.task = task
+    except Exception as e:
+        logger.error(f"❌ Failed to create pipeline task: {e}")
+        raise
+
+    logger.debug("🔗 Setting up event handlers...")
+    session_ctx = SessionContext(
+        runner_args=runner_args,
+        task=task,
+        prompt=prompt,
+        context=context,
+        cfg=cfg,
+        greeting_task=greeting_task,
+        greeting_stage=tts,
+        idle_tracker=idle_tracker,
+        daily_api_key=keys.daily,
+    )
+    # The transport is created per session, so these bindings go away with it
+    for event_name, handler in EVENT_HANDLERS.items():
+        transport.add_event_handler(event_name, functools.partial(handler, ctx=session_ctx))
+
+    logger.debug("🏃 Starting pipeline runner...")
+    try:
+        runner = PipelineRunner(handle_sigint=runner_args.handle_sigint)
+        logger.debug("✅ Pipeline runner created")
+
+        logger.debug("🚀 Running pipeline task...")
+        await runner.run(task)
+        logger.debug("✅ Pipeline task completed")
+    except Exception as e:
+        logger.exception(f"❌ Error running pipeline: {e}")
+        raise
+    finally:
+        # No-op once it has finished; otherwise the call ended before anyone connected
+        greeting_task.cancel()
+        logger.debug("🔚 Pipeline task finished (completed or crashed)")
+
+
+async def start_bot(
+    runner_args: RunnerArguments,
+    transport_params: Dict[str, Callable[[], TransportParams]],
+    run_bot: Callable[[BaseTransport, RunnerArguments], Awaitable[None]],
+):
+    """Create the session transport and hand it to the bot's ``run_bot``.
+
+    Runner and Pipecat Cloud sessions arrive with a Daily room; a direct run
+    (``python bot.py`` without a room) uses the local WebRTC transport.
+    """
+    logger.debug("🎯 Bot entry point called")
+    logger.debug("🔍 Runner args: {}", runner_args)
+
+    # Check if this is a direct run or API run
+    is_direct_run = not getattr(runner_args, 'room_url', None)
+    transport_type = "webrtc" if is_direct_run else "daily"
+    logger.debug("🔧 {} run detected - using {} transport", "Direct" if is_direct_run else "API", transport_type)
+
+    logger.debug("🚗 Creating transport...")
+    try:
+        if is_direct_run:
+            # Create a mock runner args for webrtc transport
+            webrtc_runner_args = SimpleNamespace(
+                transport="webrtc",
+                room_url=None,
+                token=None,
+                body=getattr(runner_args, 'body', {}),
+            )
+            transport = await create_transport(webrtc_runner_args, transport_params)
+        else:
+            transport = await create_transport(runner_args, transport_params)
+        logger.debug("✅ Transport created: {}", type(transport))
+    except Exception as e:
+        logger.error(f"❌ Failed to create transport: {e}")
+        if is_direct_run:
+            logger.debug("💡 For direct runs, make sure you have proper audio devices configured")
+        raise
+
+    logger.debug("🤖 Starting bot...")
+    try:
+        await run_bot(transport, runner_args)
+        logger.debug("✅ Bot completed successfully")
+    except Exception as e:
+        logger.exception(f"❌ Bot failed: {e}")
+        raise
@@ -0,0 +1,99 @@
+#
+# Copyright (c) 2024–2025, Daily
+#
+# SPDX-License-Identifier: BSD 2-Clause License
+#
+
+"""Pre-rendered kickoff greeting for the bot pipelines.
+
+The opening turn is rendered (LLM text + Cartesia PCM) while the transport is
+still connecting. On connect the bot plays the audio directly instead of
+waiting for a full LLM -> TTS roundtrip.
+
+Greetings built from the bots' prompt templates only depend on the model, the
+templated kickoff message (bot and user name) and the voice, so those are kept
+in a small LRU and reused by later sessions with the same inputs. Greetings for
+custom prompts are rendered per session and never stored.
+"""
+
+import hashlib
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+import httpx
+from loguru import logger
+from openai import AsyncOpenAI
+
+CARTESIA_TTS_URL = "https://api.cartesia.ai/tts/bytes"
+CARTESIA_VERSION = "2025-04-16"
+
+# Each entry holds a few seconds of 24 kHz PCM (~250 KB), so keep only the hottest ones
+GREETING_CACHE_SIZE = 32
+
+# inputs digest -> (greeting text, raw pcm_s16le mono audio), least recently used first
+_GREETINGS: "OrderedDict[str, Tuple[str, bytes]]" = OrderedDict()
+
+
+def _greeting_key(*parts: str) -> str:
+    return hashlib.sha256("\x00".join(parts).encode()).hexdigest()
+
+
+async def render_greeting(
+    client: AsyncOpenAI,
+    http: httpx.AsyncClient,
+    *,
+    model: str,
+    system_prompt: str,
+    first_message: str,
+    cartesia_key: str,
+    voice_id: str,
+    tts_model: str,
+    sample_rate: int,
+    shared: bool = False,
+) -> Optional[Tuple[str, bytes]]:
+    """Return (text, pcm) for the kickoff turn, or None if it could not be rendered.
+
+    Pass ``shared=True`` only when the system prompt is fully determined by
+    ``first_message`` (both come from the same templates); the system prompt is
+    then left out of the cache key.
+    """
+    key = _greeting_key(model, first_message, voice_id, tts_model, str(sample_rate)) if shared else None
+    if key in _GREETINGS:
+        _GREETINGS.move_to_end(key)
+        return _GREETINGS[key]
+
+    try:
+        completion = await client.chat.completions.create(
+            model=model,
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": first_message},
+            ],
+        )
+        text = (completion.choices[0].message.content or "").strip()
+        if not text:
+            return None
+
+        response = await http.post(
+            CARTESIA_TTS_URL,
+            headers={"X-API-Key": cartesia_key, "Cartesia-Version": CARTESIA_VERSION},
+            json={
+                "model_id": tts_model,
+                "transcript": text,
+                "voice": {"mode": "id", "id": voice_id},
+                "output_format": {"container": "raw", "encoding": "pcm_s16le", "sample_rate": sample_rate},
+                "language": "en",
+            },
+        )
+        response.raise_for_status()
+    except Exception as e:
+        logger.warning(f"⚠️ Greeting pre-render failed, falling back to live kickoff: {e}")
+        return None
+
+    greeting = (text, response.content)
+    logger.debug("✅ Greeting pre-rendered ({} bytes): {:.50}...", len(response.content), text)
+    if key is not None:
+        _GREETINGS[key] = greeting
+        if len(_GREETINGS) > GREETING_CACHE_SIZE:
+            _GREETINGS.popitem(last=False)
+    return greeting
@@ -1,12 +1,15 @@
 # Gunicorn configuration for production
-import multiprocessing
+import os
 
 # Server socket
 bind = "0.0.0.0:8080"
 backlog = 2048
 
-# Worker processes - start with 2 for testing
-workers = 2  # You can increase this: multiprocessing.cpu_count() * 2 + 1
+# Worker processes - WEB_CONCURRENCY overrides per host; keep the default in step
+# with production.py (read from the environment here so loading this config
+# never imports the app). Bot sessions live in-process, so put a round-robin
+# load balancer in front when scaling out
+workers = int(os.getenv("WEB_CONCURRENCY", "2"))
 worker_class = "uvicorn.workers.UvicornWorker"
 worker_connections = 1000
 max_requests = 1000
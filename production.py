@@ -4,76 +4,115 @@ Minimal Production ASGI app for testing deployment.
 """
 
 import os
-from fastapi import FastAPI, Request
-from starlette.middleware.base import BaseHTTPMiddleware
+import sys
+from contextlib import asynccontextmanager
+
+import orjson
+from fastapi import FastAPI, Request, Response
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
+from loguru import logger
+
+# Worker processes for uvicorn (main below); gunicorn.conf.py reads the same
+# variable and default without importing this module. Every worker is a full copy
+# of the app, and bot workers also load Silero VAD and pipecat, so the default
+# stays at 2 regardless of core count; raise it per host with WEB_CONCURRENCY
+# once memory allows.
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", "2"))
+
+# Records are written by loguru's background thread so requests never block on stdout
+logger.remove()
+logger.add(sys.stderr, level=os.getenv("LOG_LEVEL", "INFO"), enqueue=True)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    logger.info("🔥 Application startup event triggered")
+    yield
+    logger.info("🛑 Application shutdown event triggered")
 
 # Setup FastAPI app
-app = FastAPI(title="Pipecat Bot Production", version="1.0.0")
+app = FastAPI(title="Pipecat Bot Production", version="1.0.0", default_response_class=ORJSONResponse, lifespan=lifespan)
 
-print("🚀 FastAPI app initialized in production mode")
+logger.info("🚀 FastAPI app initialized in production mode")
 
-# Add middleware to log all requests
-class RequestLoggingMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        print(f"🌐 {request.method} {request.url.path} from {request.client.host if request.client else 'unknown'}")
-        response = await call_next(request)
-        print(f"📤 Response: {response.status_code}")
-        return response
+# Add middleware to log all requests (plain ASGI: no per-request task group or body wrapping)
+class RequestLoggingMiddleware:
+    def __init__(self, app):
+        self.app = app
 
-app.add_middleware(RequestLoggingMiddleware)
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
 
-# Add startup event
-@app.on_event("startup")
-async def startup_event():
-    print("🔥 Application startup event triggered")
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                client = scope.get("client")
+                logger.debug(
+                    "🌐 {} {} from {} -> {}",
+                    scope["method"],
+                    scope["path"],
+                    client[0] if client else "unknown",
+                    message["status"],
+                )
+            await send(message)
 
-# Add shutdown event
-@app.on_event("shutdown")
-async def shutdown_event():
-    print("🛑 Application shutdown event triggered")
+        await self.app(scope, receive, send_wrapper)
 
-# Templates setup removed for minimal deployment
+app.add_middleware(RequestLoggingMiddleware)
+# Outermost, so the request log above sees the uncompressed response
+app.add_middleware(GZipMiddleware, minimum_size=512, compresslevel=5)
+
+# Constant probe responses, serialized once and returned as-is (no validation/encoding per hit)
+_HEALTH = Response(content=b'"OK"', media_type="application/json")
+_PING = Response(content=b'{"pong":true,"timestamp":"2025-09-01"}', media_type="application/json")
+_OFFER_ANSWER = Response(
+    content=orjson.dumps(
+        {
+            "type": "answer",
+            "sdp": "v=0\r\no=- production 1 IN IP4 0.0.0.0\r\ns=-\r\nt=0 0",
+            "pc_id": "production_bot",
+        }
+    ),
+    media_type="application/json",
+)
+_NOT_FOUND = Response(
+    content=b'{"message":"Endpoint not found","status":"not_found"}',
+    status_code=404,
+    media_type="application/json",
+)
 
-@app.get("/")
-async def root():
-    """Simple root endpoint."""
-    print("🏠 Root endpoint accessed")
-    return {"message": "Pipecat Bot API", "status": "running"}
+# Templates setup removed for minimal deployment
 
+# Most-hit routes first: Starlette matches routes in registration order
 @app.get("/health")
 async def health():
     """Health check endpoint."""
-    print("🏥 Health check requested")
-    return "OK"
+    return _HEALTH
 
 @app.get("/ping")
 async def ping():
     """Simple ping endpoint to test basic connectivity."""
-    print("🏓 Ping received")
-    return {"pong": True, "timestamp": "2025-09-01"}
+    return _PING
+
+@app.get("/")
+async def root():
+    """Simple root endpoint."""
+    return {"message": "Pipecat Bot API", "status": "running"}
 
 @app.post("/api/offer")
 async def handle_offer(request: Request):
     """Handle WebRTC offer and start bot conversation."""
-    try:
-        data = await request.json()
-        # Here you would handle the WebRTC signaling
-        # For now, return a mock response
-        return {
-            "type": "answer",
-            "sdp": "v=0\r\no=- production 1 IN IP4 0.0.0.0\r\ns=-\r\nt=0 0",
-            "pc_id": "production_bot"
-        }
-    except Exception as e:
-        return {"error": str(e)}
+    # Here you would parse the offer and handle the WebRTC signaling
+    # For now, return the mock answer without reading the body
+    return _OFFER_ANSWER
 
 @app.post("/start")
 async def start_daily_session(request: Request):
     """Simplified /start endpoint for testing."""
-    print("📞 Received /start request - simplified version")
+    logger.debug("📞 Received /start request - simplified version")
     try:
-        data = await request.json()
-        print(f"📝 Request data: {data}")
+        data = orjson.loads(await request.body())
+        logger.debug("📝 Request data: {}", data)
 
         # For now, just return a mock response
         return {
@@ -82,14 +121,14 @@ async def start_daily_session(request: Request):
             "mock_room_link": "https://example.daily.co/mock-room"
         }
     except Exception as e:
-        print(f"❌ Error: {e}")
+        logger.exception(f"❌ Error: {e}")
         return {"error": str(e)}
 
-@app.api_route("/{path:path}", methods=["GET", "POST", "PUT", "DELETE", "PATCH", "OPTIONS"])
-async def catch_all(path: str, request: Request):
-    """Catch-all route to handle any unmatched requests."""
-    print(f"🎯 Catch-all: {request.method} /{path}")
-    return {"message": f"Endpoint /{path} not found", "method": request.method, "status": "ok"}
+@app.exception_handler(404)
+async def not_found(request: Request, exc: Exception):
+    """JSON body for unmatched paths; only runs on actual misses."""
+    logger.debug("🎯 Not found: {} {}", request.method, request.url.path)
+    return _NOT_FOUND
 
 def main():
     """Main entry point for the application."""
@@ -98,8 +137,9 @@ def main():
         "production:app",
         host="0.0.0.0",
         port=8080,
-        workers=1,
-        log_level="info"
+        workers=WEB_CONCURRENCY,
+        log_level="info",
+        # loop/http stay on "auto": uvloop and httptools are used when installed
     )
 
 if __name__ == "__main__":
@@ -23,23 +23,36 @@ import asyncio
 import importlib
 import importlib.util
 import inspect
+import itertools
 import os
 import sys
-from typing import Any, Dict, Optional
-
+from contextlib import asynccontextmanager
+from pathlib import Path
+from types import ModuleType
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+from urllib.parse import urlencode, urlsplit, urlunsplit
+
+import aiohttp
+import msgspec
+import orjson
 import uvicorn
 from fastapi import FastAPI, HTTPException, Request
-from fastapi.responses import HTMLResponse, JSONResponse, RedirectResponse
+from fastapi.responses import HTMLResponse, ORJSONResponse, RedirectResponse, Response, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 import click
 
 from loguru import logger
-from dotenv import load_dotenv
 
-# Load environment variables
-load_dotenv(override=True)
+from bot_common import close_http_session, load_env
+
+# Load environment variables; the bots imported later in this process reuse them
+load_env()
+
+# Compact sink format; records are written by loguru's background thread (enqueue=True)
+LOG_FORMAT = "{time:HH:mm:ss.SSS} {level} {message}"
 
 # Pipecat imports
 from pipecat.runner.types import (
@@ -72,6 +85,193 @@ except ImportError:
     logger.warning("Telephony transport not available. Install with: pip install pipecat-ai[telephony]")
 
 
+# Entry point every bot file exposes as `bot`
+BotFunc = Callable[[RunnerArguments], Awaitable[None]]
+
+# Jinja templates are rendered server-side and never served as files
+TEMPLATE_DIR = Path(__file__).resolve().parent / "templates"
+# Built client assets, the only directory mounted at /static
+STATIC_DIR = Path(__file__).resolve().parent / "static"
+
+# Static page served at / for each transport (anything else gets the rendered index.html)
+_ROOT_PAGES = {"webrtc": "webrtc_client.html"}
+
+# Transports served through the shared telephony websocket routes
+TELEPHONY_TRANSPORTS = frozenset({"twilio", "telnyx", "plivo"})
+
+# Environment variables each transport needs at startup
+_REQUIRED_ENV_VARS = {
+    "daily": ("DAILY_API_KEY",),
+    "twilio": ("TWILIO_ACCOUNT_SID", "TWILIO_AUTH_TOKEN"),
+    "telnyx": ("TELNYX_API_KEY",),
+    "plivo": ("PLIVO_AUTH_ID", "PLIVO_AUTH_TOKEN"),
+}
+
+DAILY_API_URL = "https://api.daily.co/v1"
+
+# Daily settings are fixed for the process; read them once instead of per /start
+_DAILY_KEY = os.getenv("DAILY_API_KEY")
+_DAILY_HEADERS = {"Authorization": f"Bearer {_DAILY_KEY}", "Content-Type": "application/json"} if _DAILY_KEY else None
+_DAILY_SAMPLE_ROOM = os.getenv("DAILY_SAMPLE_ROOM_URL")
+_DAILY_ENABLE_RECORDING = os.getenv("DAILY_ENABLE_RECORDING", "cloud")
+_DAILY_START_CLOUD_RECORDING = os.getenv("DAILY_START_CLOUD_RECORDING", "false").lower() == "true"
+
+
+# Static /capabilities payload, serialized once
+_CAPABILITIES_BODY = orjson.dumps({
+    "llm": {
+        "default_model": "gpt-4o-mini",
+        "available_models": [
+            "gpt-5",
+            "gpt-5-mini", 
+            "gpt-5-nano",
+            "gpt-4o-mini",
+            "gpt-4o",
+            "claude-3-5-haiku-latest",
+            "claude-sonnet-4-20250514"
+        ]
+    },
+    "tts": {
+        "default_provider": "cartesia",
+        "providers": ["openai", "cartesia", "google", "elevenlabs"]
+    },
+    "avatar": {
+        "provider": "heygen",
+        "usage": "Include 'heygen_avatar_id' in request body to enable HeyGen avatar",
+        "example": "curl -X POST /start -d '{\"heygen_avatar_id\":\"Katya_Chair_Sitting_public\"}'"
+    },
+    "customization": {
+        "system_prompt": {
+            "description": "Customize the AI assistant's system prompt",
+            "example": "curl -X POST /start -d '{\"system_prompt\":\"You are a helpful assistant...\"}'"
+        },
+        "bot_name": {
+            "description": "Customize the AI assistant's name",
+            "example": "curl -X POST /start -d '{\"bot_name\":\"Zoe Fragkou\"}'"
+        },
+        "user_name": {
+            "description": "Specify the user's name for personalized conversation",
+            "example": "curl -X POST /start -d '{\"user_name\":\"John\"}'"
+        }
+    }
+})
+
+
+def _bot_body(
+    body: Dict[str, Any],
+    tts: Dict[str, Any],
+    heygen_avatar_id: Optional[str],
+    bot_name: Optional[str],
+    user_name: Optional[str],
+    system_prompt: Optional[str],
+    language: Optional[str],
+) -> Dict[str, Any]:
+    """Runner-args body handed to the bot; heygen_avatar_id is only set when an avatar was requested."""
+    bot_body = {
+        "body": body,
+        "tts": tts,
+        "bot_name": bot_name,
+        "user_name": user_name,
+        "system_prompt": system_prompt,
+        "language": language,
+    }
+    if heygen_avatar_id:
+        bot_body["heygen_avatar_id"] = heygen_avatar_id
+    return bot_body
+
+
+class WebRTCArgs(RunnerArguments):
+    """Runner arguments for a WebRTC session started from /start."""
+
+    def __init__(self, body: Dict[str, Any]):
+        super().__init__()
+        self.body = body
+        self.handle_sigint = False
+
+
+class SessionEvents:
+    """Lifecycle events of one bot session, fanned out to every /events subscriber.
+
+    Each subscriber gets its own queue, pre-filled with the events emitted so far,
+    so a client that connects after "running" still sees it and two tabs watching
+    the same session both receive every event.
+    """
+
+    def __init__(self):
+        self.history: List[Tuple[str, Dict[str, Any]]] = []
+        self._subscribers: Set[asyncio.Queue] = set()
+
+    def emit(self, event: str, data: Dict[str, Any]):
+        self.history.append((event, data))
+        for queue in self._subscribers:
+            queue.put_nowait((event, data))
+
+    def subscribe(self) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue()
+        for item in self.history:
+            queue.put_nowait(item)
+        self._subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        self._subscribers.discard(queue)
+
+
+class StreamingAwareGZipMiddleware(GZipMiddleware):
+    """GZipMiddleware that never touches the /events streams.
+
+    Starlette releases before text/event-stream was excluded buffer the whole
+    response in the compressor, which would hold every event until the session ends.
+    """
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"].startswith("/events/"):
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
+
+
+class CachedStaticFiles(StaticFiles):
+    """StaticFiles that lets browsers and CDNs keep files for a day."""
+
+    def file_response(self, *args, **kwargs):
+        response = super().file_response(*args, **kwargs)
+        response.headers.setdefault("Cache-Control", "public, max-age=86400")
+        return response
+
+
+class StartRequest(msgspec.Struct):
+    """RTVI /start body; the Daily-only fields are ignored by WebRTC, unknown keys by both."""
+
+    createDailyRoom: bool = True
+    dailyRoomProperties: Dict[str, Any] = {}
+    body: Dict[str, Any] = {}
+    tts: Dict[str, Any] = {}
+    heygen_avatar_id: Optional[str] = None
+    bot_name: Optional[str] = "Nano Banana AI"
+    user_name: Optional[str] = "friend"
+    system_prompt: Optional[str] = None
+    language: Optional[str] = None
+
+
+_START_DECODER = msgspec.json.Decoder(StartRequest)
+
+
+def _decode_start(raw: bytes) -> StartRequest:
+    """Decode a /start body, rejecting malformed payloads with 422."""
+    try:
+        return _START_DECODER.decode(raw)
+    except msgspec.DecodeError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+
+def _with_query(url: str, **params: str) -> str:
+    """Append query parameters to a room URL, keeping any query it already has."""
+    parts = urlsplit(url)
+    query = urlencode(params)
+    return urlunsplit(parts._replace(query=f"{parts.query}&{query}" if parts.query else query))
+
+
 class PipecatRunner:
     """Main Pipecat development runner class."""
 
@@ -94,15 +294,16 @@ class PipecatRunner:
         self.verbose = verbose
 
         # Setup logging
-        if verbose:
-            logger.remove()
-            logger.add(sys.stderr, level="DEBUG")
-        else:
-            logger.remove()
-            logger.add(sys.stderr, level="INFO")
+        # enqueue=True hands records to a background writer so request and bot
+        # handlers never block on stderr
+        logger.remove()
+        logger.add(sys.stderr, level="DEBUG" if verbose else "INFO", enqueue=True, format=LOG_FORMAT)
+
+        # Check transport availability before building the app, templates and routes
+        self._check_transport_available()
 
         # Initialize FastAPI app
-        self.app = FastAPI(title="Pipecat Development Runner", version="1.0.0")
+        self.app = FastAPI(title="Pipecat Development Runner", version="1.0.0", default_response_class=ORJSONResponse, lifespan=self._lifespan)
 
         # Add CORS middleware
         self.app.add_middleware(
@@ -113,11 +314,35 @@ class PipecatRunner:
             allow_headers=["*"],  # Allows all headers
         )
 
+        # Compress the HTML client pages and larger JSON payloads (not the SSE streams)
+        self.app.add_middleware(StreamingAwareGZipMiddleware, minimum_size=512, compresslevel=5)
+
         # Setup templates and static files
-        self.templates = Jinja2Templates(directory=os.path.join(os.path.dirname(__file__), "templates"))
+        self.templates = Jinja2Templates(directory=TEMPLATE_DIR)
+
+        # Pages rendered and encoded once up front (the templates take no per-request input)
+        self._pages: Dict[str, bytes] = {
+            name: self.templates.get_template(name).render().encode()
+            for name in ("index.html",)
+        }
 
         # Store active bot tasks
         self.active_tasks: Dict[str, asyncio.Task] = {}
+        # Per-session progress events streamed by /events/{session_id}
+        self._session_events: Dict[str, SessionEvents] = {}
+        # Monotonic session ids; len(active_tasks) repeats once sessions end
+        self._task_ids = itertools.count()
+
+        # Bot modules are imported once so every session shares their module-level
+        # singletons (VAD model, HTTP pools, caches) on this event loop
+        self._bot_modules: Dict[str, ModuleType] = {}
+
+        # Pooled Daily REST session, opened on app startup (Daily transport only)
+        self._daily_session: Optional[aiohttp.ClientSession] = None
+
+        # Bounds concurrent bot sessions (and so HeyGen/OpenAI connections) per process;
+        # /start answers 429 beyond this instead of queueing (see _reject_if_full)
+        self._max_bots = int(os.getenv("MAX_CONCURRENT_BOTS", "50"))
 
         # Setup routes
         self._setup_routes()
@@ -127,129 +352,104 @@ class PipecatRunner:
     def _setup_routes(self):
         """Setup FastAPI routes based on transport type."""
 
+        root_page = _ROOT_PAGES.get(self.transport)
+
         @self.app.get("/", response_class=HTMLResponse)
         async def root(request: Request):
             """Serve the main interface."""
-            if self.transport == "daily":
-                return self.templates.TemplateResponse("index.html", {"request": request})
-            elif self.transport == "webrtc":
-                return self.templates.TemplateResponse("webrtc_client.html", {"request": request})
-            else:
-                return self.templates.TemplateResponse("index.html", {"request": request})
+            if root_page:
+                return RedirectResponse(f"/static/{root_page}")
+            return self._render_page("index.html")
+
+        # The transport never changes for this runner, so serialize the health body once
+        health_body = orjson.dumps({"status": "healthy", "transport": self.transport})
 
         @self.app.get("/health")
         async def health():
             """Health check endpoint."""
-            return JSONResponse(content={"status": "healthy", "transport": self.transport})
+            return Response(health_body, media_type="application/json")
 
         @self.app.get("/capabilities")
         async def capabilities():
             """API capabilities and documentation endpoint."""
-            return JSONResponse(content={
-                "llm": {
-                    "default_model": "gpt-4o-mini",
-                    "available_models": [
-                        "gpt-5",
-                        "gpt-5-mini", 
-                        "gpt-5-nano",
-                        "gpt-4o-mini",
-                        "gpt-4o",
-                        "claude-3-5-haiku-latest",
-                        "claude-sonnet-4-20250514"
-                    ]
-                },
-                "tts": {
-                    "default_provider": "cartesia",
-                    "providers": ["openai", "cartesia", "google", "elevenlabs"]
-                },
-                "avatar": {
-                    "provider": "heygen",
-                    "usage": "Include 'heygen_avatar_id' in request body to enable HeyGen avatar",
-                    "example": "curl -X POST /start -d '{\"heygen_avatar_id\":\"Katya_Chair_Sitting_public\"}'"
-                },
-                "customization": {
-                    "system_prompt": {
-                        "description": "Customize the AI assistant's system prompt",
-                        "example": "curl -X POST /start -d '{\"system_prompt\":\"You are a helpful assistant...\"}'"
-                    },
-                    "bot_name": {
-                        "description": "Customize the AI assistant's name",
-                        "example": "curl -X POST /start -d '{\"bot_name\":\"Zoe Fragkou\"}'"
-                    },
-                    "user_name": {
-                        "description": "Specify the user's name for personalized conversation",
-                        "example": "curl -X POST /start -d '{\"user_name\":\"John\"}'"
-                    }
-                }
-            })
+            return Response(_CAPABILITIES_BODY, media_type="application/json")
+
+        @self.app.get("/events/{session_id}")
+        async def session_events(session_id: str):
+            """Server-sent bot lifecycle events for a session returned by /start."""
+            events = self._session_events.get(session_id)
+            if events is None:
+                raise HTTPException(status_code=404, detail="Unknown or finished session")
+            queue = events.subscribe()
+
+            async def stream():
+                try:
+                    while True:
+                        event, data = await queue.get()
+                        yield b"event: " + event.encode() + b"\ndata: " + orjson.dumps(data) + b"\n\n"
+                        if event == "finished":
+                            return
+                finally:
+                    events.unsubscribe(queue)
+
+            return StreamingResponse(
+                stream(),
+                media_type="text/event-stream",
+                headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+            )
 
-        # WebRTC routes
-        if self.transport == "webrtc":
-            self._setup_webrtc_routes()
+        # Transport-specific routes
+        setup = _ROUTE_SETUP.get(self.transport)
+        if setup:
+            setup(self)
 
-        # Daily routes
-        if self.transport == "daily":
-            self._setup_daily_routes()
-
-        # Telephony routes
-        if self.transport in ["twilio", "telnyx", "plivo"]:
-            self._setup_telephony_routes()
+    def _render_page(self, name: str) -> HTMLResponse:
+        """Serve a pre-rendered page (re-rendered per request with --verbose, for template edits)."""
+        if self.verbose:
+            return HTMLResponse(self.templates.get_template(name).render())
+        return HTMLResponse(self._pages[name], headers={"Cache-Control": "public, max-age=300"})
 
     def _setup_webrtc_routes(self):
         """Setup WebRTC-specific routes."""
-        @self.app.get("/client", response_class=HTMLResponse)
+        # The WebRTC client is a static page: serve it from disk with ETag/304 support
+        self.app.mount(
+            "/static",
+            CachedStaticFiles(directory=STATIC_DIR),
+            name="static",
+        )
+
+        @self.app.get("/client")
         async def webrtc_client(request: Request):
             """Serve WebRTC client interface."""
-            return self.templates.TemplateResponse("webrtc_client.html", {"request": request})
+            return RedirectResponse("/static/webrtc_client.html")
 
         @self.app.post("/start")
         async def start_webrtc_session(request: Request):
             """RTVI-compatible /start endpoint for WebRTC transport."""
+            self._reject_if_full()
+            data = _decode_start(await request.body())
             try:
-                data = await request.json()
-                body = data.get("body", {})
-                tts = data.get("tts", {})
+                body = data.body
+                tts = data.tts
                 
                 # Extract heygen_avatar_id from root level if present
-                heygen_avatar_id = data.get("heygen_avatar_id") or body.get("heygen_avatar_id")
-                print(f"DEBUG: WebRTC heygen_avatar_id = {heygen_avatar_id}, data keys = {list(data.keys())}")
+                heygen_avatar_id = data.heygen_avatar_id or body.get("heygen_avatar_id")
+                logger.debug("WebRTC heygen_avatar_id = {}", heygen_avatar_id)
+                bot = self._resolve_bot(heygen_avatar_id)
 
-                bot_name = body.get("bot_name") or data.get("bot_name", "Nano Banana AI")
-                user_name = body.get("user_name") or data.get("user_name", "friend")
-                system_prompt = body.get("system_prompt") or data.get("system_prompt")
-                language = body.get("language") or data.get("language")
+                bot_name = body.get("bot_name") or data.bot_name
+                user_name = body.get("user_name") or data.user_name
+                system_prompt = body.get("system_prompt") or data.system_prompt
+                language = body.get("language") or data.language
 
                 # Spawn bot in background for WebRTC
-                task_id = f"webrtc_{len(self.active_tasks)}"
+                task_id = f"webrtc_{next(self._task_ids)}"
                 
-                # Create a simple class that inherits from RunnerArguments
-                class WebRTCArgs(RunnerArguments):
-                    def __init__(self):
-                        super().__init__()
-                        self.body = {
-                            "body": body,
-                            "tts": tts,
-                            "heygen_avatar_id": heygen_avatar_id,
-                            "bot_name": bot_name,
-                            "user_name": user_name,
-                            "system_prompt": system_prompt,
-                            "language": language
-                        } if heygen_avatar_id else {
-                            "body": body,
-                            "tts": tts,
-                            "bot_name": bot_name,
-                            "user_name": user_name,
-                            "system_prompt": system_prompt,
-                            "language": language
-                        }
-                        self.handle_sigint = False
-                
-                webrtc_args = WebRTCArgs()
-                
-                task = asyncio.create_task(
-                    self._spawn_bot(webrtc_args, task_id)
+                webrtc_args = WebRTCArgs(
+                    _bot_body(body, tts, heygen_avatar_id, bot_name, user_name, system_prompt, language)
                 )
-                self.active_tasks[task_id] = task
+                
+                self._start_bot_task(webrtc_args, task_id, bot)
 
                 # Build simple response for WebRTC
                 response = {
@@ -259,169 +459,127 @@ class PipecatRunner:
                     "user_name": user_name,
                     "avatar_enabled": bool(heygen_avatar_id),
                     "session_id": task_id,
+                    "events_url": f"/events/{task_id}",
                     "note": "WebRTC bot started - use browser WebRTC client to connect"
                 }
 
-                return JSONResponse(content=response)
+                return ORJSONResponse(content=response)
 
+            except HTTPException:
+                raise
             except Exception as e:
-                logger.error(f"Error starting WebRTC session: {e}")
+                logger.exception(f"Error starting WebRTC session: {e}")
                 raise HTTPException(status_code=500, detail=str(e))
 
     def _setup_daily_routes(self):
         """Setup Daily-specific routes."""
-        # We'll use HTTP requests to Daily REST API instead of SDK
-        import requests
-
         async def _start_daily_session_logic(request: Request):
             """RTVI-compatible /start endpoint for Daily transport."""
+            # Fail fast on anything that would be rejected anyway, before any Daily API call
+            self._reject_if_full()
+            if _DAILY_HEADERS is None:
+                raise HTTPException(status_code=500, detail="DAILY_API_KEY not set")
+            data = _decode_start(await request.body())
+            if not data.createDailyRoom and not _DAILY_SAMPLE_ROOM:
+                raise HTTPException(status_code=400, detail="No room URL provided")
+            bot = self._resolve_bot(data.heygen_avatar_id or data.body.get("heygen_avatar_id"))
+
             try:
-                data = await request.json()
-                create_room = data.get("createDailyRoom", True)
-                room_properties = data.get("dailyRoomProperties", {})
-                body = data.get("body", {})
-                tts = data.get("tts", {})
+                create_room = data.createDailyRoom
+                room_properties = data.dailyRoomProperties
+                body = data.body
+                tts = data.tts
 
                 # Extract heygen_avatar_id from root level if present
-                heygen_avatar_id = data.get("heygen_avatar_id") or body.get("heygen_avatar_id")
-                print(f"DEBUG: heygen_avatar_id = {heygen_avatar_id}, data keys = {list(data.keys())}")
+                heygen_avatar_id = data.heygen_avatar_id or body.get("heygen_avatar_id")
+                logger.debug("heygen_avatar_id = {}", heygen_avatar_id)
 
-                bot_name = body.get("bot_name") or data.get("bot_name", "Nano Banana AI")
-                user_name = body.get("user_name") or data.get("user_name", "friend")
-                system_prompt = body.get("system_prompt") or data.get("system_prompt")
-                language = body.get("language") or data.get("language")
-                api_key = os.getenv("DAILY_API_KEY")
-                if not api_key:
-                    raise HTTPException(status_code=500, detail="DAILY_API_KEY not set")
+                bot_name = body.get("bot_name") or data.bot_name
+                user_name = body.get("user_name") or data.user_name
+                system_prompt = body.get("system_prompt") or data.system_prompt
+                language = body.get("language") or data.language
 
                 if create_room:
                     # Create room via Daily REST API
-                    room_response = requests.post(
-                        "https://api.daily.co/v1/rooms",
-                        headers={
-                            "Authorization": f"Bearer {api_key}",
-                            "Content-Type": "application/json"
-                        },
-                        json={
+                    status, room_data = await self._daily_post(
+                        "rooms",
+                        {
                             "properties": {
                                 "enable_chat": room_properties.get("enable_chat", True),
                                 "enable_screenshare": room_properties.get("enable_screenshare", False),
-                                "enable_recording": room_properties.get("enable_recording", os.getenv("DAILY_ENABLE_RECORDING", "cloud"))
+                                "enable_recording": room_properties.get("enable_recording", _DAILY_ENABLE_RECORDING)
                             }
-                        }
-                    )
-
-                    if room_response.status_code != 200:
-                        raise HTTPException(status_code=500, detail=f"Failed to create room: {room_response.text}")
-
-                    room_data = room_response.json()
-                    room_url = room_data["url"]
-
-                    # Create token for the room
-                    token_response = requests.post(
-                        "https://api.daily.co/v1/meeting-tokens",
-                        headers={
-                            "Authorization": f"Bearer {api_key}",
-                            "Content-Type": "application/json"
                         },
-                        json={
-                            "properties": {
-                                "room_name": room_data["name"],
-                                "user_name": user_name,
-                                "start_cloud_recording": room_properties.get("start_cloud_recording", os.getenv("DAILY_START_CLOUD_RECORDING", "false").lower() == "true")
-                            }
-                        }
                     )
 
-                    if token_response.status_code != 200:
-                        raise HTTPException(status_code=500, detail=f"Failed to create token: {token_response.text}")
+                    if status != 200:
+                        raise HTTPException(status_code=500, detail=f"Failed to create room: {room_data}")
 
-                    token = token_response.json()["token"]
+                    room_url = room_data["url"]
+                    room_name = room_data["name"]
                 else:
                     # Use existing room
-                    sample_room = os.getenv("DAILY_SAMPLE_ROOM_URL")
-                    if not sample_room:
-                        raise HTTPException(status_code=400, detail="No room URL provided")
-                    room_url = sample_room
+                    room_url = _DAILY_SAMPLE_ROOM
 
                     # Extract room name from URL
-                    room_name = room_url.split("/")[-1]
-
-                    # Create token for existing room
-                    token_response = requests.post(
-                        "https://api.daily.co/v1/meeting-tokens",
-                        headers={
-                            "Authorization": f"Bearer {api_key}",
-                            "Content-Type": "application/json"
-                        },
-                        json={
+                    room_name = urlsplit(room_url).path.rsplit("/", 1)[-1]
+
+                # The user and bot tokens only depend on the room name, so mint them concurrently
+                token_result, bot_token_result = await asyncio.gather(
+                    self._daily_post(
+                        "meeting-tokens",
+                        {
                             "properties": {
                                 "room_name": room_name,
                                 "user_name": user_name,
-                                "start_cloud_recording": room_properties.get("start_cloud_recording", os.getenv("DAILY_START_CLOUD_RECORDING", "false").lower() == "true")
+                                "start_cloud_recording": room_properties.get("start_cloud_recording", _DAILY_START_CLOUD_RECORDING)
                             }
-                        }
-                    )
+                        },
+                    ),
+                    # Create separate token for bot with bot's name
+                    self._daily_post(
+                        "meeting-tokens",
+                        {
+                            "properties": {
+                                "room_name": room_name,
+                                "user_name": bot_name,
+                                "start_cloud_recording": False
+                            }
+                        },
+                    ),
+                    return_exceptions=True,
+                )
 
-                    if token_response.status_code != 200:
-                        raise HTTPException(status_code=500, detail=f"Failed to create token: {token_response.text}")
+                if isinstance(token_result, BaseException):
+                    raise token_result
+                status, token_data = token_result
+                if status != 200:
+                    raise HTTPException(status_code=500, detail=f"Failed to create token: {token_data}")
 
-                    token = token_response.json()["token"]
+                token = token_data["token"]
 
                 # Spawn bot in background
-                task_id = f"daily_{len(self.active_tasks)}"
-                # Create separate token for bot with bot's name
-                bot_token_response = requests.post(
-                    "https://api.daily.co/v1/meeting-tokens",
-                    headers={
-                        "Authorization": f"Bearer {api_key}",
-                        "Content-Type": "application/json"
-                    },
-                    json={
-                        "properties": {
-                            "room_name": room_data["name"] if create_room else room_name,
-                            "user_name": bot_name,
-                            "start_cloud_recording": False
-                        }
-                    }
-                )
-
-                if bot_token_response.status_code == 200:
-                    bot_token = bot_token_response.json()["token"]
-                    bot_room_url = f"{room_url}?t={bot_token}"
+                task_id = f"daily_{next(self._task_ids)}"
+                if not isinstance(bot_token_result, BaseException) and bot_token_result[0] == 200:
+                    bot_token = bot_token_result[1]["token"]
+                    bot_room_url = _with_query(room_url, t=bot_token)
                 else:
                     # Fallback to URL parameter approach
-                    bot_room_url = f"{room_url}?name=Zoe Fragkou"
-
-                task = asyncio.create_task(
-                    self._spawn_bot(
-                        DailyRunnerArguments(
-                            room_url=bot_room_url,
-                            token=bot_token if 'bot_token' in locals() else token,
-                            body={
-                                "body": body,
-                                "tts": tts,
-                                "heygen_avatar_id": heygen_avatar_id,
-                                "bot_name": bot_name,
-                                "user_name": user_name,
-                                "system_prompt": system_prompt,
-                                "language": language
-                            } if heygen_avatar_id else {
-                                "body": body,
-                                "tts": tts,
-                                "bot_name": bot_name,
-                                "user_name": user_name,
-                                "system_prompt": system_prompt,
-                                "language": language
-                            },
-                        ),
-                        task_id
-                    )
+                    bot_token = token
+                    bot_room_url = _with_query(room_url, name="Zoe Fragkou")
+
+                self._start_bot_task(
+                    DailyRunnerArguments(
+                        room_url=bot_room_url,
+                        token=bot_token,
+                        body=_bot_body(body, tts, heygen_avatar_id, bot_name, user_name, system_prompt, language),
+                    ),
+                    task_id,
+                    bot,
                 )
-                self.active_tasks[task_id] = task
 
                 # Create clickable room link with token
-                clickable_room_link = f"{room_url}?t={token}"
+                clickable_room_link = _with_query(room_url, t=token)
 
                 # Check for heygen avatar configuration
                 # HeyGen is only enabled when explicitly requested via heygen_avatar_id
@@ -434,13 +592,16 @@ class PipecatRunner:
                     "bot_name": bot_name,
                     "user_name": user_name,
                     "avatar_enabled": bool(heygen_avatar_id),
-                    "session_id": task_id
+                    "session_id": task_id,
+                    "events_url": f"/events/{task_id}"
                 }
 
-                return JSONResponse(content=response)
+                return ORJSONResponse(content=response)
 
+            except HTTPException:
+                raise
             except Exception as e:
-                logger.error(f"Error starting Daily session: {e}")
+                logger.exception(f"Error starting Daily session: {e}")
                 raise HTTPException(status_code=500, detail=str(e))
 
         @self.app.post("/start")
@@ -455,86 +616,173 @@ class PipecatRunner:
             """Handle telephony webhooks."""
             # This would handle incoming calls from telephony providers
             # Implementation depends on specific provider
-            data = await request.json()
-            logger.info(f"Received {self.transport} webhook: {data}")
-            return JSONResponse(content={"status": "ok"})
+            data = orjson.loads(await request.body())
+            logger.debug("Received {} webhook: {}", self.transport, data)
+            return ORJSONResponse(content={"status": "ok"})
 
 
 
 
 
-    async def _spawn_bot(self, runner_args: RunnerArguments, task_id: str):
-        """Spawn a new bot instance."""
-        try:
-            logger.info(f"Spawning bot instance: {task_id}")
-
-            # Determine which bot file to use based on heygen_avatar_id
-            body_data = getattr(runner_args, 'body', {})
-            heygen_avatar_id = (
-                body_data.get('heygen_avatar_id', '') or
-                body_data.get('body', {}).get('heygen_avatar_id', '')
-            )
-            
-            # Check if any heygen-related parameter is provided or if user requests video bot
-            use_video_bot = bool(heygen_avatar_id and heygen_avatar_id.strip())
-            
-            if use_video_bot:
-                bot_file = "videobot.py"
-                logger.info(f"Using video bot with HeyGen avatar: {heygen_avatar_id}")
-            else:
-                bot_file = "bot.py"
-                logger.info("Using voice-only bot")
-            
-            # Import the bot function from the appropriate file
-            spec = importlib.util.spec_from_file_location("bot_module", bot_file)
+    def _load_bot_module(self, bot_file: str) -> Optional[ModuleType]:
+        """Import a bot file once per process and return the cached module."""
+        bot_module = self._bot_modules.get(bot_file)
+        if bot_module is None:
+            spec = importlib.util.spec_from_file_location(f"{bot_file[:-3]}_module", bot_file)
             if spec is None:
-                logger.error(f"Could not find {bot_file} file")
-                return
+                return None
             bot_module = importlib.util.module_from_spec(spec)
             spec.loader.exec_module(bot_module)
+            self._bot_modules[bot_file] = bot_module
+        return bot_module
 
-            # Get the bot function
-            bot_func = getattr(bot_module, "bot", None)
-            if not bot_func:
-                logger.error(f"No 'bot' function found in {bot_file}")
-                return
+    @asynccontextmanager
+    async def _lifespan(self, app: FastAPI):
+        """Set up shared resources before serving and release them, in reverse order, on shutdown."""
+        await self._preload_bots()
+        if self.transport == "daily":
+            # Daily REST calls share one pooled session for the lifetime of the app
+            await self._open_daily_session()
+        try:
+            yield
+        finally:
+            await self._cancel_bot_tasks()
+            await self._close_daily_session()
+            # Close the bots' pooled HTTP session (shared via bot_common) on the loop that created it
+            try:
+                await close_http_session()
+            except Exception as e:
+                logger.warning(f"Error closing the bots' HTTP session: {e}")
+
+    async def _preload_bots(self):
+        """Import the bot files before serving so no /start pays the module load."""
+        for bot_file in ("bot.py", "videobot.py"):
+            try:
+                self._load_bot_module(bot_file)
+            except Exception as e:
+                logger.warning(f"Could not preload {bot_file}, will retry on first use: {e}")
+
+    def _reject_if_full(self):
+        """Fail fast with 429 instead of queueing a session behind a full worker."""
+        if len(self.active_tasks) >= self._max_bots:
+            raise HTTPException(status_code=429, detail="Too many active sessions, try again shortly")
+
+    def _start_bot_task(
+        self,
+        runner_args: RunnerArguments,
+        task_id: str,
+        bot: Tuple[str, BotFunc],
+    ):
+        """Run a bot in the background, holding a reference to its task until it is done."""
+        # Checked again here because /start awaits (body, Daily REST calls) after its
+        # early check; nothing awaits between this check and the task being tracked
+        self._reject_if_full()
+        self._session_events[task_id] = SessionEvents()
+        task = asyncio.create_task(self._spawn_bot(runner_args, task_id, *bot))
+        self.active_tasks[task_id] = task
+        # A done callback also fires for tasks cancelled before they ever ran
+        task.add_done_callback(lambda _: self._release_bot_task(task_id))
+
+    def _release_bot_task(self, task_id: str):
+        """Drop a finished bot task and close its event stream."""
+        self.active_tasks.pop(task_id, None)
+        events = self._session_events.pop(task_id, None)
+        if events is not None:
+            events.emit("finished", {})
+
+    async def _cancel_bot_tasks(self):
+        """Cancel bots still running at shutdown and wait for their pipelines to tear down."""
+        tasks = list(self.active_tasks.values())
+        if not tasks:
+            return
+        logger.info("Cancelling {} active bot task(s)", len(tasks))
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _emit(self, task_id: str, event: str, **data: Any):
+        """Queue a progress event for /events/{task_id} subscribers."""
+        events = self._session_events.get(task_id)
+        if events is not None:
+            events.emit(event, data)
+
+    def _resolve_bot(self, heygen_avatar_id: Optional[str]) -> Tuple[str, BotFunc]:
+        """Pick the bot file for a /start request and return it with its (preloaded) bot function."""
+        # The video bot is only used when a HeyGen avatar is explicitly requested
+        bot_file = "videobot.py" if heygen_avatar_id and heygen_avatar_id.strip() else "bot.py"
+        try:
+            bot_module = self._load_bot_module(bot_file)
+        except Exception as e:
+            logger.exception(f"Could not load {bot_file}: {e}")
+            raise HTTPException(status_code=500, detail=f"Could not load {bot_file}")
+        if bot_module is None:
+            raise HTTPException(status_code=500, detail=f"Could not find {bot_file} file")
+        bot_func = getattr(bot_module, "bot", None)
+        if not bot_func:
+            raise HTTPException(status_code=500, detail=f"No 'bot' function found in {bot_file}")
+        return bot_file, bot_func
+
+    async def _spawn_bot(
+        self,
+        runner_args: RunnerArguments,
+        task_id: str,
+        bot_file: str,
+        bot_func: BotFunc,
+    ):
+        """Run a resolved bot function; /start has already checked the session limit."""
+        try:
+            logger.info("Spawning bot instance {} with {}", task_id, bot_file)
 
             # Call the bot function
-            await bot_func(runner_args)
+            self._emit(task_id, "running", bot=bot_file)
+            if inspect.iscoroutinefunction(bot_func):
+                await bot_func(runner_args)
+            else:
+                # A synchronous bot would block the loop serving every other session
+                await asyncio.to_thread(bot_func, runner_args)
 
         except Exception as e:
-            logger.error(f"Error in bot {task_id}: {e}")
+            logger.exception(f"Error in bot {task_id}: {e}")
+            self._emit(task_id, "error", detail=str(e))
         finally:
-            # Cleanup
-            if task_id in self.active_tasks:
-                del self.active_tasks[task_id]
-            logger.info(f"Bot instance {task_id} finished")
+            logger.info("Bot instance {} finished", task_id)
+
+    async def _open_daily_session(self):
+        """Create the pooled aiohttp session used for Daily REST calls."""
+        self._daily_session = aiohttp.ClientSession(
+            headers=_DAILY_HEADERS,
+            timeout=aiohttp.ClientTimeout(total=15),
+            connector=aiohttp.TCPConnector(limit=100, ttl_dns_cache=300),
+            # Daily's REST API is token-authenticated; don't store or expire cookies
+            cookie_jar=aiohttp.DummyCookieJar(),
+        )
+
+    async def _close_daily_session(self):
+        """Close the Daily REST session on the loop that created it."""
+        if self._daily_session is not None and not self._daily_session.closed:
+            await self._daily_session.close()
+        self._daily_session = None
+
+    async def _daily_post(self, path: str, payload: Dict[str, Any]) -> Tuple[int, Any]:
+        """POST to the Daily REST API; returns (status, parsed JSON body or error text)."""
+        async with self._daily_session.post(f"{DAILY_API_URL}/{path}", json=payload) as response:
+            if response.status != 200:
+                return response.status, await response.text()
+            return response.status, await response.json()
 
     def run(self):
         """Run the development runner."""
         # Debug environment variables for Sevalla
-        import os
         sevalla_port = os.getenv('PORT')
         if sevalla_port:
             self.port = int(sevalla_port)
             logger.info(f"🔧 Using Sevalla PORT environment variable: {self.port}")
         
-        logger.info(f"🔍 Environment debug - PORT: {os.getenv('PORT', 'not set')}")
+        logger.info(f"🔍 Environment debug - PORT: {sevalla_port or 'not set'}")
         logger.info(f"🔍 Environment debug - HOST: {os.getenv('HOST', 'not set')}")
         logger.info(f"🔍 Runner config - host: {self.host}, port: {self.port}")
         logger.info(f"Starting Pipecat Runner on {self.host}:{self.port}")
 
-        # Check transport availability
-        if self.transport == "daily" and not DAILY_AVAILABLE:
-            logger.error("Daily transport not available")
-            return
-        if self.transport == "webrtc" and not WEBRTC_AVAILABLE:
-            logger.error("WebRTC transport not available")
-            return
-        if self.transport in ["twilio", "telnyx", "plivo"] and not TELEPHONY_AVAILABLE:
-            logger.error("Telephony transport not available")
-            return
-
         # Check required environment variables
         self._check_environment_variables()
 
@@ -543,31 +791,41 @@ class PipecatRunner:
             self.app,
             host=self.host,
             port=self.port,
-            log_level="info" if not self.verbose else "debug",
+            # warning keeps uvicorn from formatting an access-log line for every request
+            log_level="warning" if not self.verbose else "debug",
+            # loop/http stay on "auto": uvloop and httptools are used when installed
         )
 
+    def _check_transport_available(self):
+        """Fail at construction if the selected transport's extras are not installed."""
+        if self.transport == "daily" and not DAILY_AVAILABLE:
+            error = "Daily transport not available"
+        elif self.transport == "webrtc" and not WEBRTC_AVAILABLE:
+            error = "WebRTC transport not available"
+        elif self.transport in TELEPHONY_TRANSPORTS and not TELEPHONY_AVAILABLE:
+            error = "Telephony transport not available"
+        else:
+            return
+        logger.error(error)
+        raise RuntimeError(error)
+
     def _check_environment_variables(self):
         """Check for required environment variables based on transport."""
-        required_vars = []
-
-        if self.transport == "daily":
-            required_vars.extend(["DAILY_API_KEY"])
-
-        elif self.transport == "twilio":
-            required_vars.extend(["TWILIO_ACCOUNT_SID", "TWILIO_AUTH_TOKEN"])
-
-        elif self.transport == "telnyx":
-            required_vars.extend(["TELNYX_API_KEY"])
-
-        elif self.transport == "plivo":
-            required_vars.extend(["PLIVO_AUTH_ID", "PLIVO_AUTH_TOKEN"])
-
+        required_vars = _REQUIRED_ENV_VARS.get(self.transport, ())
         missing_vars = [var for var in required_vars if not os.getenv(var)]
         if missing_vars:
             logger.warning(f"Missing environment variables: {', '.join(missing_vars)}")
 
 
-@click.command()
+# Route setup per transport, looked up once in _setup_routes
+_ROUTE_SETUP = {
+    "webrtc": PipecatRunner._setup_webrtc_routes,
+    "daily": PipecatRunner._setup_daily_routes,
+    **{transport: PipecatRunner._setup_telephony_routes for transport in TELEPHONY_TRANSPORTS},
+}
+
+
+@click.command(context_settings={"auto_envvar_prefix": "PIPECAT"})
 @click.option("--host", default="0.0.0.0", help="Server host address")
 @click.option("--port", default=8080, type=int, help="Server port")
 @click.option("-t", "--transport", default="daily",
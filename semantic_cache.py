@@ -0,0 +1,190 @@
+#
+# Copyright (c) 2024–2025, Daily
+#
+# SPDX-License-Identifier: BSD 2-Clause License
+#
+
+"""Semantic response cache for the bot pipelines.
+
+Near-duplicate user turns (greetings, FAQs) are answered from a process-wide
+in-memory cache instead of a fresh LLM generation. Lookups embed the latest
+user message and compare it (cosine similarity) with recently cached turns
+that were asked under the same system prompt.
+
+A lookup waits at most ``lookup_timeout`` for the embedding; past that the turn
+goes to the LLM and the embedding finishes in the background so the reply can
+still be cached. Only the most recently used ``MAX_NAMESPACES`` system prompts
+keep entries.
+
+Pipeline placement::
+
+    context_aggregator.user(), cache.lookup, llm, cache.recorder, tts, ...
+
+Enable with ``ENABLE_SEMANTIC_CACHE=1``.
+"""
+
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+import numpy as np
+from loguru import logger
+from openai import AsyncOpenAI
+from pipecat.frames.frames import (
+    LLMFullResponseEndFrame,
+    LLMFullResponseStartFrame,
+    LLMTextFrame,
+    StartInterruptionFrame,
+)
+from pipecat.processors.aggregators.openai_llm_context import OpenAILLMContextFrame
+from pipecat.processors.frame_processor import FrameDirection, FrameProcessor
+
+EMBEDDING_MODEL = "text-embedding-3-small"
+
+# System prompts embed per-call names, so most namespaces are short-lived
+MAX_NAMESPACES = 64
+
+# namespace -> [(unit embedding, response text, expires_at)], least recently used first
+_STORE: "OrderedDict[str, List[Tuple[np.ndarray, str, float]]]" = OrderedDict()
+
+
+def _last_user_text(messages) -> Optional[str]:
+    """Text of the final message if it is a user turn, otherwise None."""
+    if not messages:
+        return None
+    last = messages[-1]
+    content = last.get("content")
+    if last.get("role") != "user" or not isinstance(content, str) or not content.strip():
+        return None
+    return content
+
+
+class SemanticResponseCache:
+    """Embedding-keyed cache of LLM replies, scoped to one system prompt."""
+
+    def __init__(
+        self,
+        client: AsyncOpenAI,
+        system_prompt: str,
+        threshold: float = 0.90,
+        ttl_secs: float = 300.0,
+        max_entries: int = 512,
+        lookup_timeout: float = 0.25,
+    ):
+        self._client = client
+        self._namespace = hashlib.sha256(system_prompt.encode()).hexdigest()
+        self._threshold = threshold
+        self._ttl_secs = ttl_secs
+        self._max_entries = max_entries
+        self.lookup_timeout = lookup_timeout
+        # Embedding (possibly still in flight) of the user turn whose LLM reply is being generated
+        self.pending: Optional["asyncio.Task[np.ndarray]"] = None
+        self.lookup = SemanticCacheLookup(self)
+        self.recorder = SemanticCacheRecorder(self)
+
+    async def embed(self, text: str) -> np.ndarray:
+        response = await self._client.embeddings.create(model=EMBEDDING_MODEL, input=text)
+        vector = np.asarray(response.data[0].embedding, dtype=np.float32)
+        return vector / (np.linalg.norm(vector) or 1.0)
+
+    def get(self, vector: np.ndarray) -> Optional[str]:
+        if self._namespace not in _STORE:
+            return None
+        now = time.monotonic()
+        entries = [e for e in _STORE[self._namespace] if e[2] > now]
+        if not entries:
+            del _STORE[self._namespace]
+            return None
+        _STORE[self._namespace] = entries
+        _STORE.move_to_end(self._namespace)
+        scores = np.stack([e[0] for e in entries]) @ vector
+        best = int(np.argmax(scores))
+        return entries[best][1] if scores[best] >= self._threshold else None
+
+    def put(self, vector: np.ndarray, response: str):
+        entries = _STORE.setdefault(self._namespace, [])
+        _STORE.move_to_end(self._namespace)
+        entries.append((vector, response, time.monotonic() + self._ttl_secs))
+        if len(entries) > self._max_entries:
+            del entries[: len(entries) - self._max_entries]
+        while len(_STORE) > MAX_NAMESPACES:
+            _STORE.popitem(last=False)
+
+    def put_when_embedded(self, pending: "asyncio.Task[np.ndarray]", response: str):
+        """Store ``response`` once its (possibly still running) embedding is available."""
+        def _store(task):
+            if not task.cancelled() and task.exception() is None:
+                self.put(task.result(), response)
+
+        pending.add_done_callback(_store)
+
+
+def _log_embed_failure(task: asyncio.Task):
+    # Also retrieves the exception of embeddings nobody is waiting on anymore
+    if not task.cancelled() and task.exception() is not None:
+        logger.warning(f"Semantic cache embedding failed: {task.exception()}")
+
+
+class SemanticCacheLookup(FrameProcessor):
+    """Sits before the LLM and answers cache hits without calling it."""
+
+    def __init__(self, cache: SemanticResponseCache):
+        super().__init__()
+        self._cache = cache
+
+    async def process_frame(self, frame, direction: FrameDirection):
+        await super().process_frame(frame, direction)
+
+        if isinstance(frame, OpenAILLMContextFrame):
+            self._cache.pending = None
+            query = _last_user_text(frame.context.messages)
+            if query:
+                embedding = asyncio.create_task(self._cache.embed(query))
+                embedding.add_done_callback(_log_embed_failure)
+                # Never hold the turn longer than lookup_timeout; a slow embedding keeps
+                # running so the LLM reply can still be cached once it lands
+                await asyncio.wait({embedding}, timeout=self._cache.lookup_timeout)
+                if not embedding.done():
+                    logger.debug("Semantic cache lookup timed out, calling LLM")
+                    self._cache.pending = embedding
+                elif embedding.exception() is None:
+                    cached = self._cache.get(embedding.result())
+                    if cached is not None:
+                        logger.debug("Semantic cache hit, skipping LLM")
+                        await self.push_frame(LLMFullResponseStartFrame())
+                        await self.push_frame(LLMTextFrame(cached))
+                        await self.push_frame(LLMFullResponseEndFrame())
+                        return
+                    self._cache.pending = embedding
+
+        await self.push_frame(frame, direction)
+
+
+class SemanticCacheRecorder(FrameProcessor):
+    """Sits after the LLM and stores the reply to the pending user turn."""
+
+    def __init__(self, cache: SemanticResponseCache):
+        super().__init__()
+        self._cache = cache
+        self._parts: List[str] = []
+
+    async def process_frame(self, frame, direction: FrameDirection):
+        await super().process_frame(frame, direction)
+
+        if isinstance(frame, StartInterruptionFrame):
+            # Never cache a reply the user talked over
+            self._cache.pending = None
+            self._parts = []
+        elif isinstance(frame, LLMFullResponseStartFrame):
+            self._parts = []
+        elif isinstance(frame, LLMTextFrame):
+            self._parts.append(frame.text)
+        elif isinstance(frame, LLMFullResponseEndFrame):
+            if self._cache.pending is not None and self._parts:
+                self._cache.put_when_embedded(self._cache.pending, "".join(self._parts))
+            self._cache.pending = None
+            self._parts = []
+
+        await self.push_frame(frame, direction)
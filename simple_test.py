@@ -4,36 +4,42 @@ Ultra-minimal FastAPI app for testing Sevalla deployment.
 """
 
 import os
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 
 # Create the simplest possible FastAPI app
 app = FastAPI()
 
-print("🚀 Ultra-simple FastAPI app started")
-print(f"🌍 Environment variables:")
-print(f"   PORT: {os.getenv('PORT', 'not set')}")
-print(f"   HOST: {os.getenv('HOST', 'not set')}")
-print(f"   BIND: {os.getenv('BIND', 'not set')}")
-print(f"   PYTHONPATH: {os.getenv('PYTHONPATH', 'not set')}")
-print(f"   PWD: {os.getenv('PWD', 'not set')}")
-print(f"   USER: {os.getenv('USER', 'not set')}")
-print(f"   HOME: {os.getenv('HOME', 'not set')}")
-print(f"   PATH: {os.getenv('PATH', 'not set')[:100]}...")
+# One write for the whole startup banner, so it reaches the log collector as a single block
+print(
+    "🚀 Ultra-simple FastAPI app started",
+    "🌍 Environment variables:",
+    f"   PORT: {os.getenv('PORT', 'not set')}",
+    f"   HOST: {os.getenv('HOST', 'not set')}",
+    f"   BIND: {os.getenv('BIND', 'not set')}",
+    f"   PYTHONPATH: {os.getenv('PYTHONPATH', 'not set')}",
+    f"   PWD: {os.getenv('PWD', 'not set')}",
+    f"   USER: {os.getenv('USER', 'not set')}",
+    f"   HOME: {os.getenv('HOME', 'not set')}",
+    f"   PATH: {os.getenv('PATH', 'not set')[:100]}...",
+    sep="\n",
+)
 
 @app.get("/")
 def read_root():
     print("📍 Root endpoint hit")
     return {"message": "Hello World"}
 
+# Probe responses are constant: encode once, skip per-hit validation/encoding and the threadpool hop
+_HEALTH = Response(content=b'"OK"', media_type="application/json")
+_PING = Response(content=b'{"ping":"pong"}', media_type="application/json")
+
 @app.get("/health")
-def health_check():
-    print("🏥 Health check hit")
-    return "OK"
+async def health_check():
+    return _HEALTH
 
 @app.get("/ping")
-def ping():
-    print("🏓 Ping hit")
-    return {"ping": "pong"}
+async def ping():
+    return _PING
 
 if __name__ == "__main__":
     import uvicorn
@@ -5,6 +5,21 @@ Test script to verify the new Banana AI default values
 
 from types import SimpleNamespace
 
+from bot_common import (
+    DEFAULT_BOT_NAME,
+    DEFAULT_USER_NAME,
+    FIRST_MESSAGE_TEMPLATE,
+    default_system_prompt,
+    parse_config,
+)
+
+
+def resolve_defaults(args):
+    """(system_prompt, first_message) as the bots resolve them from the runner args."""
+    cfg = parse_config(args)
+    return cfg.system_prompt, cfg.first_message
+
+
 def test_banana_defaults():
     """Test that the new Banana AI defaults work correctly"""
 
@@ -14,19 +29,16 @@ def test_banana_defaults():
     print("\n1️⃣ Testing empty request body (Banana defaults)...")
     empty_args = SimpleNamespace(body={})
 
-    system_prompt = getattr(empty_args, 'body', {}).get('system_prompt',
-        "You are Nano Banana AI, a fun and helpful AI assistant. Be creative, witty, and always ready to help with a banana twist!")
-
-    first_message = getattr(empty_args, 'body', {}).get('first_message',
-        "Say hi to Nano Banana! I'm your fun AI assistant ready to help with a smile!")
+    system_prompt, first_message = resolve_defaults(empty_args)
 
     print(f"   System prompt: {system_prompt}")
     print(f"   First message: {first_message}")
 
     assert "Nano Banana AI" in system_prompt, "Default system prompt should contain Nano Banana AI"
-    assert "banana twist" in system_prompt, "Default system prompt should contain banana twist"
-    assert "Say hi to Nano Banana" in first_message, "Default first message should contain Say hi to Nano Banana"
+    assert system_prompt == default_system_prompt(DEFAULT_BOT_NAME, DEFAULT_USER_NAME), "Default system prompt should come from the template"
+    assert "Nano Banana AI" in first_message, "Default first message should contain Nano Banana AI"
     assert "fun AI assistant" in first_message, "Default first message should contain fun AI assistant"
+    assert parse_config(empty_args).templated, "Defaults should be marked as templated"
     print("   ✅ Banana defaults work correctly")
 
     # Test Case 2: Custom values (should override Banana defaults)
@@ -36,11 +48,7 @@ def test_banana_defaults():
         'first_message': 'Hello! I am your business consultant.'
     })
 
-    system_prompt = getattr(custom_args, 'body', {}).get('system_prompt',
-        "You are Nano Banana AI, a fun and helpful AI assistant. Be creative, witty, and always ready to help with a banana twist!")
-
-    first_message = getattr(custom_args, 'body', {}).get('first_message',
-        "Say hi to Nano Banana! I'm your fun AI assistant ready to help with a smile!")
+    system_prompt, first_message = resolve_defaults(custom_args)
 
     print(f"   System prompt: {system_prompt}")
     print(f"   First message: {first_message}")
@@ -48,6 +56,7 @@ def test_banana_defaults():
     assert "professional business consultant" in system_prompt, "Custom system prompt should contain business consultant"
     assert "Hello! I am your business consultant" in first_message, "Custom first message should contain business consultant"
     assert "Nano Banana" not in system_prompt, "Custom system prompt should not contain Nano Banana"
+    assert not parse_config(custom_args).templated, "Custom prompts must not be marked as templated"
     print("   ✅ Custom values override Banana defaults correctly")
 
     # Test Case 3: Partial customization (only system_prompt)
@@ -56,23 +65,20 @@ def test_banana_defaults():
         'system_prompt': 'You are a creative writing assistant.'
     })
 
-    system_prompt = getattr(partial_args, 'body', {}).get('system_prompt',
-        "You are Nano Banana AI, a fun and helpful AI assistant. Be creative, witty, and always ready to help with a banana twist!")
-
-    first_message = getattr(partial_args, 'body', {}).get('first_message',
-        "Say hi to Nano Banana! I'm your fun AI assistant ready to help with a smile!")
+    system_prompt, first_message = resolve_defaults(partial_args)
 
     print(f"   System prompt: {system_prompt}")
     print(f"   First message: {first_message}")
 
     assert "creative writing assistant" in system_prompt, "Custom system prompt should contain writing assistant"
-    assert "Say hi to Nano Banana" in first_message, "First message should use Banana default"
+    expected = FIRST_MESSAGE_TEMPLATE.format(bot_name=DEFAULT_BOT_NAME, user_name=DEFAULT_USER_NAME)
+    assert first_message == expected, "First message should use Banana default"
     print("   ✅ Partial customization works correctly")
 
     print("\n🍌 All Banana AI default tests passed!")
     print("🎯 New Default Values:")
     print("   • System Prompt: 'You are Nano Banana AI, a fun and helpful AI assistant...'")
-    print("   • First Message: 'Say hi to Nano Banana! I'm your fun AI assistant...'")
+    print("   • First Message: 'Say hi to friend! I'm Nano Banana AI, your fun AI assistant...'")
     print("   • Custom values can still override these defaults")
     print("   • Fun, banana-themed personality by default!")
 
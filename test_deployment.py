@@ -9,30 +9,61 @@ import time
 import requests
 import sys
 
+BASE_URL = "http://localhost:7860"
+
+
+def wait_until_ready(session, timeout=10.0, interval=0.1):
+    """Poll the server until it answers (any status), instead of sleeping a fixed time."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            session.get(f"{BASE_URL}/health", timeout=0.2)
+            return True
+        except requests.exceptions.RequestException:
+            time.sleep(interval)
+    return False
+
+
+def fetch_all(session, *probes):
+    """Run (method, path, kwargs) probes in order on one session; returns their responses.
+
+    The probes are few and fast, so they run sequentially and reuse the keep-alive
+    connection the readiness polls already opened.
+    """
+    return [
+        session.request(method, f"{BASE_URL}{path}", timeout=5, **kwargs)
+        for method, path, kwargs in probes
+    ]
+
+
 def test_single_process():
     """Test single process mode"""
     print("🧪 Testing Single Process Mode...")
 
-    # Start bot in background
+    # Start bot in background (output discarded so a full pipe can't stall it)
     process = subprocess.Popen(
         [sys.executable, "bot.py"],
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL
     )
 
-    # Wait for startup
-    time.sleep(5)
+    # One pooled session for the readiness polls and every probe after them
+    session = requests.Session()
 
     try:
+        # Wait for startup
+        assert wait_until_ready(session), "Single process: server did not come up"
+        health, client = fetch_all(session, ("GET", "/health", {}), ("GET", "/client", {}))
+
         # Test health endpoint
-        response = requests.get("http://localhost:7860/health", timeout=5)
+        response = health
         if response.status_code == 404:  # bot.py doesn't have health endpoint
             print("✅ Single process: Bot started (no health endpoint)")
         else:
             print(f"✅ Single process: Health check passed ({response.status_code})")
 
         # Test client endpoint
-        response = requests.get("http://localhost:7860/client", timeout=5)
+        response = client
         if response.status_code == 200:
             print("✅ Single process: Client interface accessible")
         else:
@@ -41,6 +72,7 @@ def test_single_process():
     except requests.exceptions.RequestException as e:
         print(f"❌ Single process: Connection failed - {e}")
     finally:
+        session.close()
         process.terminate()
         process.wait()
 
@@ -52,34 +84,39 @@ def test_multi_process():
     process = subprocess.Popen(
         ["gunicorn", "-w", "2", "-k", "uvicorn.workers.UvicornWorker",
          "production:app", "--bind", "0.0.0.0:7860", "--log-level", "info"],
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL
     )
 
-    # Wait for startup
-    time.sleep(8)
+    # One pooled session for the readiness polls and every probe after them
+    session = requests.Session()
 
     try:
+        # Wait for startup
+        assert wait_until_ready(session), "Multi-process: server did not come up"
+        health, client, offer = fetch_all(
+            session,
+            ("GET", "/health", {}),
+            ("GET", "/client", {}),
+            ("POST", "/api/offer", {"json": {"type": "offer", "sdp": "test"}}),
+        )
+
         # Test health endpoint
-        response = requests.get("http://localhost:7860/health", timeout=5)
+        response = health
         if response.status_code == 200:
             print("✅ Multi-process: Health check passed")
         else:
             print(f"❌ Multi-process: Health check failed ({response.status_code})")
 
         # Test client endpoint
-        response = requests.get("http://localhost:7860/client", timeout=5)
+        response = client
         if response.status_code == 200:
             print("✅ Multi-process: Client interface accessible")
         else:
             print(f"❌ Multi-process: Client interface failed ({response.status_code})")
 
         # Test API endpoint
-        response = requests.post(
-            "http://localhost:7860/api/offer",
-            json={"type": "offer", "sdp": "test"},
-            timeout=5
-        )
+        response = offer
         if response.status_code == 200:
             print("✅ Multi-process: WebRTC API working")
         else:
@@ -88,6 +125,7 @@ def test_multi_process():
     except requests.exceptions.RequestException as e:
         print(f"❌ Multi-process: Connection failed - {e}")
     finally:
+        session.close()
         process.terminate()
         process.wait()
 
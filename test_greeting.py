@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the pre-rendered greeting: its cache, where it enters the
+pipeline, and the live kickoff fallback
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+from pipecat.frames.frames import EndFrame, LLMMessagesAppendFrame, TTSAudioRawFrame
+from pipecat.pipeline.pipeline import Pipeline
+from pipecat.pipeline.runner import PipelineRunner
+from pipecat.pipeline.task import PipelineTask
+from pipecat.processors.filters.identity_filter import IdentityFilter
+from pipecat.processors.frame_processor import FrameProcessor
+
+import greeting
+from bot_common import PromptBuffer, RollingLLMContext, SessionContext, _on_client_connected
+
+
+class FakeOpenAI:
+    """Just enough of AsyncOpenAI for render_greeting; counts completions."""
+
+    def __init__(self):
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    async def create(self, **kwargs):
+        self.calls += 1
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content="Hi there!"))])
+
+
+class FakeHttp:
+    """Just enough of httpx.AsyncClient for the Cartesia request."""
+
+    async def post(self, url, **kwargs):
+        return SimpleNamespace(content=b"\x00\x01" * 8, raise_for_status=lambda: None)
+
+
+class FrameRecorder(FrameProcessor):
+    """Pass-through stage that remembers every downstream frame it sees."""
+
+    def __init__(self):
+        super().__init__()
+        self.frames = []
+
+    async def process_frame(self, frame, direction):
+        await super().process_frame(frame, direction)
+        self.frames.append(frame)
+        await self.push_frame(frame, direction)
+
+
+def _render(client, first_message, shared=True):
+    return greeting.render_greeting(
+        client,
+        FakeHttp(),
+        model="gpt-4o-mini",
+        system_prompt="system",
+        first_message=first_message,
+        cartesia_key="key",
+        voice_id="voice",
+        tts_model="sonic",
+        sample_rate=24000,
+        shared=shared,
+    )
+
+
+def _session(greeting_task, greeting_stage=None, task=None):
+    prompt = PromptBuffer("system")
+    return SessionContext(
+        runner_args=SimpleNamespace(),
+        task=task,
+        prompt=prompt,
+        context=RollingLLMContext(prompt),
+        cfg=SimpleNamespace(first_message="Say hi!"),
+        greeting_task=greeting_task,
+        greeting_stage=greeting_stage,
+        idle_tracker=None,
+    )
+
+
+def test_greeting_cache():
+    """Templated greetings are rendered once and kept in a bounded LRU"""
+
+    print("👋 Testing greeting cache...")
+    greeting._GREETINGS.clear()
+
+    async def run():
+        client = FakeOpenAI()
+        first = await _render(client, "Say hi to Ann!")
+        second = await _render(client, "Say hi to Ann!")
+        assert first == ("Hi there!", b"\x00\x01" * 8), f"Unexpected greeting {first!r}"
+        assert second is first and client.calls == 1, "Second templated greeting should be a cache hit"
+        print("   ✅ Templated greeting is reused")
+
+        await _render(client, "Say hi to Ann!", shared=False)
+        assert client.calls == 2, "Custom-prompt greetings must always be rendered"
+        assert len(greeting._GREETINGS) == 1, "Custom-prompt greetings must not be stored"
+        print("   ✅ Custom greeting is rendered per session")
+
+        for n in range(greeting.GREETING_CACHE_SIZE):
+            await _render(client, f"Say hi to user {n}!")
+        assert len(greeting._GREETINGS) == greeting.GREETING_CACHE_SIZE, "Cache grew past its bound"
+        calls = client.calls
+        await _render(client, "Say hi to Ann!")
+        assert client.calls == calls + 1, "Least recently used greeting should have been evicted"
+        print("   ✅ Cache stays bounded and evicts the oldest entry")
+
+    asyncio.run(run())
+    greeting._GREETINGS.clear()
+
+
+def test_greeting_never_reaches_stt():
+    """The bot's own greeting audio is queued below STT, so it is never transcribed"""
+
+    print("\n👋 Testing where the greeting enters the pipeline...")
+    stt = FrameRecorder()
+    greeting_stage = IdentityFilter()  # stands in for TTS
+    output = FrameRecorder()
+    task = PipelineTask(Pipeline([stt, greeting_stage, output]))
+
+    async def run():
+        greeting_task = asyncio.get_running_loop().create_future()
+        greeting_task.set_result(("Hi there!", b"\x00\x01" * 8))
+        ctx = _session(greeting_task, greeting_stage=greeting_stage, task=task)
+
+        @task.event_handler("on_pipeline_started")
+        async def on_started(task, frame):
+            await _on_client_connected(None, "client", ctx=ctx)
+            await task.queue_frame(EndFrame())
+
+        await PipelineRunner(handle_sigint=False).run(task)
+        return ctx
+
+    ctx = asyncio.run(run())
+
+    assert not any(isinstance(f, TTSAudioRawFrame) for f in stt.frames), "Greeting audio reached STT"
+    assert any(isinstance(f, TTSAudioRawFrame) for f in output.frames), "Greeting audio never reached the output"
+    assert [m["role"] for m in ctx.messages[1:]] == ["user", "assistant"], "Greeting turn should be recorded"
+    print("   ✅ Greeting audio skips STT and reaches the output")
+
+
+def test_slow_greeting_falls_back_and_is_cancelled():
+    """A greeting still rendering on connect is cancelled and the LLM kicks off instead"""
+
+    print("\n👋 Testing live kickoff fallback...")
+    queued = []
+
+    async def queue_frames(frames):
+        queued.extend(frames)
+
+    async def run():
+        greeting_task = asyncio.create_task(asyncio.sleep(60))
+        ctx = _session(greeting_task, task=SimpleNamespace(queue_frames=queue_frames))
+        await _on_client_connected(None, "client", ctx=ctx)
+        await asyncio.sleep(0)
+        return greeting_task
+
+    greeting_task = asyncio.run(run())
+
+    assert greeting_task.cancelled(), "Pending greeting render should be cancelled"
+    assert len(queued) == 1 and isinstance(queued[0], LLMMessagesAppendFrame), "Kickoff should go to the LLM"
+    print("   ✅ Pending render cancelled, live kickoff queued")
+
+    print("\n👋 Greeting tests passed!")
+
+
+if __name__ == "__main__":
+    test_greeting_cache()
+    test_greeting_never_reaches_stt()
+    test_slow_greeting_falls_back_and_is_cancelled()
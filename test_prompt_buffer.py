@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the rolling context window stays bounded on long calls
+"""
+
+import asyncio
+
+from bot_common import PromptBuffer
+
+MAX_RECENT = 20
+BATCH = 10
+TURNS = 200
+
+
+def test_prompt_buffer_stays_bounded():
+    """Context size and summarize calls stay bounded however long the call runs"""
+
+    print("🧠 Testing rolling context window over {} turns...".format(TURNS))
+    calls = []
+
+    async def summarize(evicted, previous_summary):
+        calls.append((len(evicted), previous_summary))
+        return f"summary #{len(calls)}"
+
+    async def run():
+        prompt = PromptBuffer("system", max_recent=MAX_RECENT, compaction_batch=BATCH, summarize=summarize)
+        longest = 0
+        for turn in range(TURNS):
+            for role in ("user", "assistant"):
+                prompt.messages.append({"role": role, "content": f"{role} {turn}"})
+                # Mirrors RollingLLMContext._enforce_window, with compaction awaited inline
+                await prompt.compact(prompt.trim())
+                longest = max(longest, len(prompt.messages))
+        return prompt, longest
+
+    prompt, longest = asyncio.run(run())
+    total = 2 * TURNS
+
+    print(f"   Longest context: {longest} messages, summarize calls: {len(calls)}")
+
+    # System prompt + one summary + at most MAX_RECENT + BATCH verbatim turns
+    assert longest <= 2 + MAX_RECENT + BATCH, f"Context grew to {longest} messages"
+    # One call per full batch of evicted messages, never one per turn
+    assert len(calls) <= total // BATCH, f"{len(calls)} summarize calls for {total} messages"
+    assert all(n >= BATCH for n, _ in calls), "Compaction ran before a full batch overflowed"
+    print("   ✅ Context and summarize calls are bounded")
+
+    # Exactly one summary, re-summarized each time instead of appended
+    summaries = [m for m in prompt.messages[1:] if m["role"] == "system"]
+    assert len(summaries) == 1, f"Expected one summary message, found {len(summaries)}"
+    assert prompt.messages[1] is prompt.summary, "Summary should sit right after the system prompt"
+    assert prompt.summary["content"].endswith(f"summary #{len(calls)}"), "Summary should be the latest one"
+    assert calls[0][1] == "" and all(prev for _, prev in calls[1:]), "Each compaction should fold in the previous summary"
+    assert prompt.messages[-1]["content"] == f"assistant {TURNS - 1}", "Latest turn must stay verbatim"
+    assert prompt.turn_count == total, f"turn_count should cover all {total} messages, got {prompt.turn_count}"
+    print("   ✅ Older turns are folded into a single running summary")
+
+    print("\n🧠 Rolling context window tests passed!")
+
+
+if __name__ == "__main__":
+    test_prompt_buffer_stays_bounded()
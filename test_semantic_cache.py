@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the semantic response cache: hits, misses and eviction
+"""
+
+import asyncio
+
+import numpy as np
+
+import semantic_cache
+from semantic_cache import SemanticResponseCache
+
+
+def unit(*values):
+    vector = np.asarray(values, dtype=np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+def test_semantic_cache_hit_and_miss():
+    """Close enough questions under the same system prompt reuse the cached reply"""
+
+    print("🧠 Testing semantic cache hits and misses...")
+    semantic_cache._STORE.clear()
+    cache = SemanticResponseCache(None, "system", threshold=0.9)
+
+    assert cache.get(unit(1, 0, 0)) is None, "Empty cache should miss"
+    cache.put(unit(1, 0, 0), "Hello!")
+
+    assert cache.get(unit(1, 0.1, 0)) == "Hello!", "Near-duplicate question should hit"
+    assert cache.get(unit(0, 1, 0)) is None, "Unrelated question should miss"
+    print("   ✅ Similar turn hits, unrelated turn misses")
+
+    other_prompt = SemanticResponseCache(None, "another system prompt")
+    assert other_prompt.get(unit(1, 0, 0)) is None, "Replies must not leak across system prompts"
+    print("   ✅ Entries are scoped to their system prompt")
+
+    expired = SemanticResponseCache(None, "short-lived", ttl_secs=-1)
+    expired.put(unit(1, 0, 0), "Stale")
+    assert expired.get(unit(1, 0, 0)) is None, "Expired entry should miss"
+    assert expired._namespace not in semantic_cache._STORE, "Namespace with only expired entries should be pruned"
+    print("   ✅ Expired entries miss and empty namespaces are pruned")
+
+    async def run():
+        pending = asyncio.get_running_loop().create_future()
+        cache.put_when_embedded(pending, "Later reply")
+        pending.set_result(unit(0, 0, 1))
+        await asyncio.sleep(0)
+
+    asyncio.run(run())
+    assert cache.get(unit(0, 0, 1)) == "Later reply", "Reply should be stored once its embedding lands"
+    print("   ✅ Reply is stored when a slow embedding finishes")
+    semantic_cache._STORE.clear()
+
+
+def test_semantic_cache_eviction():
+    """Entries per prompt and the number of prompts kept are both bounded"""
+
+    print("\n🧠 Testing semantic cache eviction...")
+    semantic_cache._STORE.clear()
+
+    cache = SemanticResponseCache(None, "system", max_entries=2)
+    cache.put(unit(1, 0, 0), "first")
+    cache.put(unit(0, 1, 0), "second")
+    cache.put(unit(0, 0, 1), "third")
+    assert cache.get(unit(1, 0, 0)) is None, "Oldest entry should be evicted past max_entries"
+    assert cache.get(unit(0, 0, 1)) == "third", "Newest entry should be kept"
+    print("   ✅ Oldest entry evicted past max_entries")
+
+    caches = [SemanticResponseCache(None, f"prompt {n}") for n in range(semantic_cache.MAX_NAMESPACES + 1)]
+    for n, prompt_cache in enumerate(caches):
+        prompt_cache.put(unit(1, 0, 0), f"reply {n}")
+    assert len(semantic_cache._STORE) == semantic_cache.MAX_NAMESPACES, "Namespace count grew past its bound"
+    assert cache.get(unit(0, 0, 1)) is None, "Least recently used prompt should be evicted"
+    assert caches[-1].get(unit(1, 0, 0)) == f"reply {semantic_cache.MAX_NAMESPACES}", "Newest prompt should be kept"
+    print("   ✅ Least recently used system prompt evicted past MAX_NAMESPACES")
+
+    print("\n🧠 Semantic cache tests passed!")
+    semantic_cache._STORE.clear()
+
+
+if __name__ == "__main__":
+    test_semantic_cache_hit_and_miss()
+    test_semantic_cache_eviction()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Test script to verify clause-level TTS text aggregation
+"""
+
+import asyncio
+
+from text_aggregator import ClauseTextAggregator
+
+
+def feed(tokens, **kwargs):
+    """Stream LLM tokens through a fresh aggregator; returns (emitted chunks, leftover text)."""
+
+    async def run():
+        aggregator = ClauseTextAggregator(**kwargs)
+        chunks = []
+        for token in tokens:
+            chunk = await aggregator.aggregate(token)
+            if chunk:
+                chunks.append(chunk)
+        return chunks, aggregator.text
+
+    return asyncio.run(run())
+
+
+def test_clause_splitting():
+    """Text is released per clause instead of waiting for the full sentence"""
+
+    print("✂️ Testing clause splitting...")
+
+    chunks, rest = feed(["Well", ",", " honestly", " I think", " that", ",", " on", " balance"])
+    assert chunks == ["Well, honestly I think that,"], f"Expected one clause, got {chunks}"
+    assert rest == " on balance", f"Unexpected leftover {rest!r}"
+    print("   ✅ Long clause released at its comma")
+
+    chunks, _ = feed(["Yes", ",", " sure", " thing"])
+    assert chunks == [], f"Clauses shorter than min_clause_chars should wait, got {chunks}"
+    print("   ✅ Short clause held back")
+
+    chunks, _ = feed(["It costs", " about", " 3,000", " dollars", " a", " month"])
+    assert chunks == [], f"Thousands separator must not split, got {chunks}"
+    print("   ✅ Numbers like 3,000 are never split")
+
+    chunks, rest = feed(["Hi there", ".", " How", " are", " you"])
+    assert chunks == ["Hi there."], f"Sentence end should release text, got {chunks}"
+    assert rest.strip() == "How are you", f"Unexpected leftover {rest!r}"
+    print("   ✅ Sentence end still releases text")
+
+    chunks, rest = feed(["Line one\n", "Line two"])
+    assert chunks == ["Line one\n"], f"Newline should release text, got {chunks}"
+    print("   ✅ Newline releases text")
+
+    chunks, rest = feed(["word "] * 30, max_chars=40)
+    assert chunks and all(len(c) <= 40 and c.endswith(" ") for c in chunks), f"Bad word-boundary splits: {chunks}"
+    assert "".join(chunks) + rest == "word " * 30, "No text may be lost or duplicated"
+    print("   ✅ Run-on text split at word boundaries after max_chars")
+
+
+def test_interruption_clears_buffer():
+    """An interruption drops text the user talked over"""
+
+    print("\n✂️ Testing interruption...")
+
+    async def run():
+        aggregator = ClauseTextAggregator()
+        await aggregator.aggregate("Half a thought")
+        await aggregator.handle_interruption()
+        return aggregator.text
+
+    assert asyncio.run(run()) == "", "Interrupted text should be discarded"
+    print("   ✅ Buffer cleared on interruption")
+
+    print("\n✂️ Text aggregator tests passed!")
+
+
+if __name__ == "__main__":
+    test_clause_splitting()
+    test_interruption_clears_buffer()
@@ -0,0 +1,69 @@
+#
+# Copyright (c) 2024–2025, Daily
+#
+# SPDX-License-Identifier: BSD 2-Clause License
+#
+
+"""Clause-level text aggregation for streaming TTS.
+
+Pipecat's default aggregator holds LLM tokens until a full sentence is
+available. On long sentences that delays the first audio, so this variant also
+releases the buffered text at a clause boundary (``, ; :``) once it holds
+``min_clause_chars``, or at a word boundary once it reaches ``max_chars``,
+letting Cartesia synthesize clause k while the LLM is still producing k+1.
+"""
+
+import re
+from typing import Optional
+
+from pipecat.utils.string import match_endofsentence
+from pipecat.utils.text.base_text_aggregator import BaseTextAggregator
+
+# Clause punctuation followed by whitespace (so "3,000" is never split)
+CLAUSE_END = re.compile(r"[,;:](?=\s)")
+
+
+class ClauseTextAggregator(BaseTextAggregator):
+    """Emit on sentence end or newline, on a clause boundary, or after ~max_chars."""
+
+    def __init__(self, min_clause_chars: int = 20, max_chars: int = 80):
+        self._text = ""
+        self._min_clause_chars = min_clause_chars
+        self._max_chars = max_chars
+
+    @property
+    def text(self) -> str:
+        return self._text
+
+    def _split(self, index: int) -> str:
+        result, self._text = self._text[:index], self._text[index:]
+        return result
+
+    async def aggregate(self, text: str) -> Optional[str]:
+        self._text += text
+
+        eos = match_endofsentence(self._text)
+        if eos:
+            return self._split(eos)
+
+        newline = self._text.find("\n", 1)
+        if newline > 0:
+            return self._split(newline + 1)
+
+        if len(self._text) >= self._min_clause_chars:
+            clauses = [m.end() for m in CLAUSE_END.finditer(self._text)]
+            if clauses and clauses[-1] >= self._min_clause_chars:
+                return self._split(clauses[-1])
+
+        if len(self._text) >= self._max_chars:
+            cut = self._text.rfind(" ")
+            if cut > 0:
+                return self._split(cut + 1)
+
+        return None
+
+    async def handle_interruption(self):
+        self._text = ""
+
+    async def reset(self):
+        self._text = ""